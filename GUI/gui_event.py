@@ -1,11 +1,16 @@
 import pygame
 from pygame.locals import *
-import time
-import tracemalloc
+import threading
+from types import SimpleNamespace
 from State import State
 from solver.bfs import bfs
 from solver.dfs import dfs
 from solver.a_star import a_star
+from solver.portfolio import run_portfolio
+from solver.budget import Budget, CancelToken
+
+# Giới hạn thời gian (giây) cho một lần giải nền; nút Stop hủy sớm hơn
+SEARCH_TIME_LIMIT = 60
 
 class SokobanGUIEvent:
     def __init__(self, gui_init, gui_ui, gui_game):
@@ -44,6 +49,8 @@ class SokobanGUIEvent:
         elif self.gui_ui.joy_astar.collidepoint(pos):
             self.solve_with("astar")
         elif self.gui_ui.joy_stop.collidepoint(pos):
+            if self.gui_init.searching:
+                self.gui_init.search_token.cancel()
             self.gui_init.solving = False
             self.gui_init.solution_path = []
         elif self.gui_ui.joy_compare.collidepoint(pos):
@@ -83,285 +90,94 @@ class SokobanGUIEvent:
                 self.compare_algorithms()
 
     def solve_with(self, algorithm):
-        if self.gui_init.game_completed or self.gui_init.solving or self.gui_init.animation_in_progress or self.gui_init.undo_animation_in_progress:
+        if self.gui_init.game_completed or self.gui_init.solving or self.gui_init.searching or self.gui_init.animation_in_progress or self.gui_init.undo_animation_in_progress:
             return
-        state = State.from_game(self.gui_init.game)
-        result = None
-        if algorithm == "bfs":
-            result = self.run_bfs(state)
-        elif algorithm == "dfs":
-            result = self.run_dfs(state)
+        if algorithm == "compare":
+            # Mỗi tiến trình của portfolio dựng lại trạng thái từ bản sao bàn chơi
+            state = SimpleNamespace(matrix=[list(row) for row in self.gui_init.game.matrix])
         else:
-            result = self.run_astar(state)
+            state = State.from_game(self.gui_init.game)
+
+        # Giải ở luồng nền, vòng lặp chính gọi poll_search mỗi khung hình
+        token = CancelToken()
+        budget = Budget(time_limit=SEARCH_TIME_LIMIT, token=token)
+        self.gui_init.searching = True
+        self.gui_init.search_algorithm = algorithm
+        self.gui_init.search_token = token
+        self.gui_init.search_budget = budget
+        self.gui_init.search_result = None
+        self.gui_init.search_game = self.gui_init.game
+        self.gui_init.search_move_count = self.gui_init.move_count
+        self.gui_init.search_thread = threading.Thread(target=self.search_worker, args=(algorithm, state, budget), daemon=True)
+        self.gui_init.search_thread.start()
+
+    def search_worker(self, algorithm, state, budget):
+        """Chạy ở luồng nền: gọi solver và cất kết quả cho poll_search (None nếu lỗi)"""
+        try:
+            if algorithm == "bfs":
+                result = self.run_bfs(state, budget=budget)
+            elif algorithm == "dfs":
+                result = self.run_dfs(state, budget=budget)
+            elif algorithm == "compare":
+                # Chờ mọi chiến lược để so sánh; Stop hủy qua cùng token
+                result = run_portfolio(state, first_wins=False, timeout=budget.time_limit, token=budget.token)
+            else:
+                result = self.run_astar(state, budget=budget)
+        except Exception as e:
+            print(f"Error in {algorithm}: {e}")
+            result = None
+        self.gui_init.search_result = result
+
+    def poll_search(self):
+        """Nhận kết quả khi luồng giải xong và bắt đầu phát lời giải"""
+        if not self.gui_init.searching or self.gui_init.search_thread.is_alive():
+            return
+        self.gui_init.searching = False
+        result = self.gui_init.search_result
+        # Bỏ kết quả nếu màn chơi đã đổi trong lúc giải
+        if self.gui_init.game is not self.gui_init.search_game or self.gui_init.move_count != self.gui_init.search_move_count:
+            return
+        # Luồng giải gặp lỗi (đã in ra), không có gì để hiển thị
+        if result is None:
+            return
+        if self.gui_init.search_algorithm == "compare":
+            self.gui_init.comparison_results = result[2]
+            self.gui_init.comparing = True
+            self.gui_init.comparison_start_time = pygame.time.get_ticks()
+            self.gui_init.comparison_duration = 15000  # Display for 15 seconds
+            return
         if result and result[1]:
             self.gui_init.solution_path = result[1]
             self.gui_init.solution_index = 0
             self.gui_init.solving = True
             self.gui_init.last_solution_move_time = pygame.time.get_ticks()
 
-    def run_bfs(self, state, timeout=10):
-        """Run BFS with performance tracking"""
-        try:
-            # Bắt đầu đo thời gian và bộ nhớ
-            tracemalloc.start()
-            start_time = time.time()
-        
-            # Gọi hàm BFS từ module solver
-            result = bfs(state)
-        
-            # Kết thúc đo thời gian và bộ nhớ
-            end_time = time.time()
-            current_memory, peak_memory = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
-        
-            if result:
-                path, directions = result
-                return True, directions, {
-                    "time": end_time - start_time,
-                    "nodes_explored": len(path) if path else 0,
-                    "path_length": len(directions) if directions else 0,
-                    "memory_current": current_memory / 1024,
-                    "memory_peak": peak_memory / 1024,
-                    "solution_found": True
-                }
-        
-            return False, None, {
-                "time": end_time - start_time,
-                "nodes_explored": 0,
-                "path_length": 0,
-                "memory_current": current_memory / 1024,
-                "memory_peak": peak_memory / 1024,
-                "solution_found": False
-            }
-        except Exception as e:
-            print(f"Error in BFS: {e}")
-            tracemalloc.stop()
-            return False, None, {
-                "time": 0,
-                "nodes_explored": 0,
-                "path_length": 0,
-                "memory_current": 0,
-                "memory_peak": 0,
-                "solution_found": False
-            }
-
-    def run_dfs(self, state, timeout=10):
-        """Run DFS with performance tracking"""
+    def run_solver(self, name, solver, state, timeout=10, budget=None):
+        """Chạy solver(state, budget=...), trả về (tìm thấy, directions, SolverStats)"""
+        # Thời gian, số nút và bộ nhớ do solver ghi vào budget (xem Budget.finish)
+        budget = budget or Budget(time_limit=timeout)
         try:
-            # Bắt đầu đo thời gian và bộ nhớ
-            tracemalloc.start()
-            start_time = time.time()
-        
-            # Gọi hàm DFS từ module solver
-            result = dfs(state)
-        
-            # Kết thúc đo thời gian và bộ nhớ
-            end_time = time.time()
-            current_memory, peak_memory = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
-        
-            if result:
-                path, directions = result
-                return True, directions, {
-                    "time": end_time - start_time,
-                    "nodes_explored": len(path) if path else 0,
-                    "path_length": len(directions) if directions else 0,
-                    "memory_current": current_memory / 1024,
-                    "memory_peak": peak_memory / 1024,
-                    "solution_found": True
-                }
-        
-            return False, None, {
-                "time": end_time - start_time,
-                "nodes_explored": 0,
-                "path_length": 0,
-                "memory_current": current_memory / 1024,
-                "memory_peak": peak_memory / 1024,
-                "solution_found": False
-            }
+            result = solver(state, budget=budget)
         except Exception as e:
-            print(f"Error in DFS: {e}")
-            tracemalloc.stop()
-            return False, None, {
-                "time": 0,
-                "nodes_explored": 0,
-                "path_length": 0,
-                "memory_current": 0,
-                "memory_peak": 0,
-                "solution_found": False
-            }
+            print(f"Error in {name}: {e}")
+            budget.finish(None, budget.nodes, budget.states, "error")
+            return False, None, budget.stats
+        if result:
+            return True, result[1], result.stats
+        # Dừng sớm vì hết thời gian: stats giữ thống kê tới lúc dừng
+        return False, None, budget.stats
 
-    def run_astar(self, state, timeout=10):
-        """Run A* with performance tracking using a custom wrapper"""
-        try:
-            # Bắt đầu đo thời gian và bộ nhớ
-            tracemalloc.start()
-            start_time = time.time()
-        
-            # Tạo wrapper cho thuật toán A*
-            result = self.astar_wrapper(state)
-        
-            # Kết thúc đo thời gian và bộ nhớ
-            end_time = time.time()
-            current_memory, peak_memory = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
-        
-            if result:
-                path, directions = result
-                return True, directions, {
-                    "time": end_time - start_time,
-                    "nodes_explored": len(path) if path else 0,
-                    "path_length": len(directions) if directions else 0,
-                    "memory_current": current_memory / 1024,
-                    "memory_peak": peak_memory / 1024,
-                    "solution_found": True
-                }
-        
-            return False, None, {
-                "time": end_time - start_time,
-                "nodes_explored": 0,
-                "path_length": 0,
-                "memory_current": current_memory / 1024,
-                "memory_peak": peak_memory / 1024,
-                "solution_found": False
-            }
-        except Exception as e:
-            print(f"Error in A*: {e}")
-            tracemalloc.stop()
-            return False, None, {
-                "time": 0,
-                "nodes_explored": 0,
-                "path_length": 0,
-                "memory_current": 0,
-                "memory_peak": 0,
-                "solution_found": False
-            }
+    def run_bfs(self, state, timeout=10, budget=None):
+        """Run BFS with performance tracking"""
+        return self.run_solver("BFS", bfs, state, timeout, budget)
 
-    def astar_wrapper(self, start_state):
-        """Custom implementation of A* to avoid issues with the original implementation"""
-        from collections import deque
-        import heapq
-        
-        # Hàm heuristic
-        def heuristic(state):
-            targets = state.get_targets()
-            boxes = state.boxes
-            
-            if len(boxes) == 0 or len(targets) == 0:
-                return 0
-                
-            # Tính tổng khoảng cách Manhattan từ mỗi hộp đến mục tiêu gần nhất
-            total_distance = 0
-            for box in boxes:
-                min_distance = float('inf')
-                for target in targets:
-                    distance = abs(box[0] - target[0]) + abs(box[1] - target[1])
-                    min_distance = min(min_distance, distance)
-                total_distance += min_distance
-                
-            return total_distance
-        
-        # Hàm lấy hướng di chuyển
-        def get_direction(from_pos, to_pos):
-            dx = to_pos[0] - from_pos[0]
-            dy = to_pos[1] - from_pos[1]
-            
-            if dx == -1 and dy == 0:
-                return "U"
-            elif dx == 1 and dy == 0:
-                return "D"
-            elif dx == 0 and dy == -1:
-                return "L"
-            elif dx == 0 and dy == 1:
-                return "R"
-            else:
-                return None
-        
-        # Triển khai A*
-        open_set = []
-        closed_set = set()
-        g_score = {start_state: 0}
-        f_score = {start_state: heuristic(start_state)}
-        came_from = {}
-        path_directions = {}
-        
-        # Thêm trạng thái ban đầu vào open_set
-        heapq.heappush(open_set, (f_score[start_state], id(start_state), start_state))
-        
-        while open_set:
-            # Lấy trạng thái có f_score thấp nhất
-            _, _, current = heapq.heappop(open_set)
-            
-            # Kiểm tra nếu đã đạt mục tiêu
-            if current.is_goal():
-                # Tạo đường đi
-                path = []
-                directions = []
-                while current in came_from:
-                    path.append(current)
-                    directions.append(path_directions[current])
-                    current = came_from[current]
-                
-                path.append(start_state)
-                
-                # Đảo ngược để có thứ tự từ start đến goal
-                path.reverse()
-                directions.reverse()
-                
-                return path, directions
-            
-            # Thêm vào closed_set
-            closed_set.add(current)
-            
-            # Kiểm tra deadlock
-            if current.is_deadlock():
-                continue
-            
-            # Xem xét tất cả các trạng thái kế tiếp
-            for next_state in current.get_successors():
-                # Bỏ qua nếu đã xem xét
-                if next_state in closed_set:
-                    continue
-                
-                # Tính g_score mới
-                tentative_g_score = g_score[current] + 1
-                
-                # Nếu trạng thái mới hoặc g_score tốt hơn
-                if next_state not in g_score or tentative_g_score < g_score[next_state]:
-                    # Lưu hướng di chuyển
-                    direction = get_direction(current.player, next_state.player)
-                    
-                    # Cập nhật thông tin
-                    came_from[next_state] = current
-                    path_directions[next_state] = direction
-                    g_score[next_state] = tentative_g_score
-                    f_score[next_state] = tentative_g_score + heuristic(next_state)
-                    
-                    # Thêm vào open_set nếu chưa có
-                    if next_state not in [item[2] for item in open_set]:
-                        heapq.heappush(open_set, (f_score[next_state], id(next_state), next_state))
-        
-        # Không tìm thấy đường đi
-        return None
+    def run_dfs(self, state, timeout=10, budget=None):
+        """Run DFS with performance tracking"""
+        return self.run_solver("DFS", dfs, state, timeout, budget)
 
-    def heuristic(self, state):
-        """Simple Manhattan distance heuristic for A*"""
-        targets = state.get_targets()
-        boxes = state.boxes
-        
-        if len(boxes) == 0 or len(targets) == 0:
-            return 0
-            
-        # Calculate total Manhattan distance from each box to its nearest target
-        total_distance = 0
-        for box in boxes:
-            min_distance = float('inf')
-            for target in targets:
-                distance = abs(box[0] - target[0]) + abs(box[1] - target[1])
-                min_distance = min(min_distance, distance)
-            total_distance += min_distance
-            
-        return total_distance
+    def run_astar(self, state, timeout=10, budget=None):
+        """Run A* with performance tracking"""
+        return self.run_solver("A*", a_star, state, timeout, budget)
 
     def get_direction(self, from_pos, to_pos):
         """Get direction character from position change"""
@@ -380,35 +196,6 @@ class SokobanGUIEvent:
             return None
 
     def compare_algorithms(self):
-        """Compare all three algorithms on the current level"""
-        if self.gui_init.game_completed or self.gui_init.solving or self.gui_init.animation_in_progress or self.gui_init.undo_animation_in_progress:
-            return
-            
-        print("Comparing algorithms...")
-        state = State.from_game(self.gui_init.game)
-        
-        # Run all three algorithms
-        _, _, bfs_metrics = self.run_bfs(state)
-        _, _, dfs_metrics = self.run_dfs(state)
-        _, _, astar_metrics = self.run_astar(state)
-        
-        # Store results
-        self.gui_init.comparison_results = {
-            "BFS": bfs_metrics,
-            "DFS": dfs_metrics,
-            "A*": astar_metrics
-        }
-        
-        # Print comparison results
-        print("\n=== Algorithm Comparison ===")
-        print(f"{'Algorithm':<10} {'Time (s)':<10} {'Nodes':<10} {'Path Length':<12} {'Memory (KB)':<12}")
-        print("-" * 60)
-        
-        for algo, metrics in self.gui_init.comparison_results.items():
-            path_length = metrics["path_length"] if metrics["solution_found"] else "N/A"
-            print(f"{algo:<10} {metrics['time']:<10.4f} {metrics['nodes_explored']:<10} {path_length:<12} {metrics['memory_peak']:<12.2f}")
-        
-        # Set up display
-        self.gui_init.comparing = True
-        self.gui_init.comparison_start_time = pygame.time.get_ticks()
-        self.gui_init.comparison_duration = 15000  # Display for 15 seconds
+        """Run the solver portfolio in parallel on the current level"""
+        # Chạy nền như các nút giải; poll_search hiện bảng so sánh khi xong
+        self.solve_with("compare")
@@ -207,6 +207,33 @@ class SokobanGUIGame:
             for pos in star_positions:
                 self.draw_star(subscreen, pos, star_radius, self.gui_init.YELLOW, self.gui_init.congrats_alpha)
 
+    def draw_search_progress(self, subscreen):
+        """Bảng tiến độ khi đang giải nền: số nút, tốc độ, biên, f tốt nhất"""
+        panel_height = 70
+        panel = pygame.Surface((self.gui_init.screen_width, panel_height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 180))
+        top = self.gui_init.screen_height - panel_height
+        subscreen.blit(panel, (0, top))
+
+        # Chấm động cho biết vẫn đang chạy
+        dots = "." * (pygame.time.get_ticks() // 400 % 4)
+        title = f"Solving with {self.gui_init.search_algorithm.upper()}{dots}"
+        title_text = self.gui_init.font.render(title, True, self.gui_init.YELLOW)
+        subscreen.blit(title_text, (15, top + 8))
+
+        progress = self.gui_init.search_budget.progress
+        if progress:
+            parts = [f"{progress.expanded} nodes", f"{progress.rate:.0f}/s"]
+            if progress.frontier is not None:
+                parts.append(f"frontier {progress.frontier}")
+            if progress.best_f is not None:
+                parts.append(f"best f {progress.best_f}")
+            stats = "  ".join(parts)
+        else:
+            stats = "Starting..."
+        stats_text = self.gui_init.small_font.render(stats + "  (Stop to cancel)", True, self.gui_init.LIGHT_GRAY)
+        subscreen.blit(stats_text, (15, top + 40))
+
     def draw_star(self, surface, center, radius, color, alpha):
         x, y = center
         points = []
@@ -346,7 +373,7 @@ class SokobanGUIGame:
         # Draw headers
         y_pos = 120
         headers = ["Algorithm", "Time", "Length", "Nodes", "Memory"]
-        col_widths = [0, 120, 240, 360, 470]
+        col_widths = [0, 170, 270, 370, 450]
         x_positions = [center_x - 250 + offset for offset in col_widths]
         
         for i, header in enumerate(headers):
@@ -357,46 +384,45 @@ class SokobanGUIGame:
         y_pos += 40
 
         # Draw results
-        for algorithm in ["BFS", "DFS", "A*"]:
-            if algorithm in self.gui_init.comparison_results:
-                result = self.gui_init.comparison_results[algorithm]
-
-                # Algorithm name
-                algo_text = self.gui_init.font.render(algorithm, True, self.gui_init.WHITE)
-                subscreen.blit(algo_text, (x_positions[0], y_pos))
-
-                # Time
-                time_text = self.gui_init.font.render(f"{result['time']:.4f}", True, self.gui_init.WHITE)
-                subscreen.blit(time_text, (x_positions[1], y_pos))
-
-                # Path length
-                if result["solution_found"]:
-                    path_text = self.gui_init.font.render(f"{result['path_length']}", True, self.gui_init.WHITE)
-                else:
-                    path_text = self.gui_init.font.render("N/A", True, self.gui_init.RED)
-                subscreen.blit(path_text, (x_positions[2], y_pos))
+        for algorithm, result in self.gui_init.comparison_results.items():
+            # Algorithm name
+            algo_text = self.gui_init.font.render(algorithm, True, self.gui_init.WHITE)
+            subscreen.blit(algo_text, (x_positions[0], y_pos))
+
+            # Time
+            time_text = self.gui_init.font.render(f"{result.wall_time:.4f}", True, self.gui_init.WHITE)
+            subscreen.blit(time_text, (x_positions[1], y_pos))
+
+            # Path length
+            if result.solved:
+                path_text = self.gui_init.font.render(f"{result.path_length}", True, self.gui_init.WHITE)
+            elif result.status in ("cancelled", "timeout"):
+                path_text = self.gui_init.font.render(result.status, True, self.gui_init.LIGHT_GRAY)
+            else:
+                path_text = self.gui_init.font.render("N/A", True, self.gui_init.RED)
+            subscreen.blit(path_text, (x_positions[2], y_pos))
 
-                # Nodes explored
-                nodes_text = self.gui_init.font.render(f"{result['nodes_explored']}", True, self.gui_init.WHITE)
-                subscreen.blit(nodes_text, (x_positions[3], y_pos))
+            # Nodes expanded
+            nodes_text = self.gui_init.font.render(f"{result.expanded}", True, self.gui_init.WHITE)
+            subscreen.blit(nodes_text, (x_positions[3], y_pos))
 
-                # Memory peak
-                memory_text = self.gui_init.font.render(f"{result['memory_peak']:.2f}", True, self.gui_init.WHITE)
-                subscreen.blit(memory_text, (x_positions[4], y_pos))
+            # Memory peak (KB)
+            memory_text = self.gui_init.font.render(f"{result.memory_peak / 1024:.2f}", True, self.gui_init.WHITE)
+            subscreen.blit(memory_text, (x_positions[4], y_pos))
 
-                y_pos += 40
+            y_pos += 32
 
         # Draw conclusion
         best_time = best_path = None
         best_time_algo = best_path_algo = None
 
         for algorithm, result in self.gui_init.comparison_results.items():
-            if result["solution_found"]:
-                if best_time is None or result["time"] < best_time:
-                    best_time = result["time"]
+            if result.solved:
+                if best_time is None or result.wall_time < best_time:
+                    best_time = result.wall_time
                     best_time_algo = algorithm
-                if best_path is None or (result["path_length"] > 0 and result["path_length"] < best_path):
-                    best_path = result["path_length"]
+                if best_path is None or (result.path_length > 0 and result.path_length < best_path):
+                    best_path = result.path_length
                     best_path_algo = algorithm
 
         y_pos += 20
@@ -410,11 +436,10 @@ class SokobanGUIGame:
             subscreen.blit(optimal_text, (center_x - 150, y_pos))
 
         # Draw algorithm characteristics
-        y_pos += 60
+        y_pos += 50
         characteristics = [
-            "BFS: Guarantees shortest path, but uses more memory",
-            "DFS: Uses less memory, but may find longer paths",
-            "A*: Balances speed and path quality using heuristics"
+            "Every strategy runs in its own process until it finishes;",
+            "the time limit or Stop cancels the rest"
         ]
 
         for char in characteristics:
@@ -67,6 +67,16 @@ class SokobanGUIInit:
         self.congrats_fade_in = True
         self.pending_undo = 0
 
+        # Background solving
+        self.searching = False
+        self.search_algorithm = None
+        self.search_thread = None
+        self.search_token = None
+        self.search_budget = None
+        self.search_result = None
+        self.search_game = None
+        self.search_move_count = 0
+
         # Algorithm comparison
         self.comparing = False
         self.comparison_results = {}
@@ -118,6 +128,9 @@ class SokobanGUIInit:
         return max(1, count)
 
     def load_level(self, level_number):
+        # Hủy lần giải nền của màn cũ
+        if self.searching:
+            self.search_token.cancel()
         try:
             with open(f"Level/level{level_number}.txt") as f:
                 level_data = [list(line.strip('\n')) for line in f]
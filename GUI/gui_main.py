@@ -28,6 +28,9 @@ class SokobanGUIMain:
                 elif event.type == KEYDOWN:
                     self.gui_event.handle_keydown(event)
 
+            # Pick up a finished background search
+            self.gui_event.poll_search()
+
             # Apply solution move if solving
             if self.gui_init.solving:
                 self.gui_game.apply_solution_move()
@@ -56,6 +59,10 @@ class SokobanGUIMain:
             if self.gui_init.show_congrats:
                 self.gui_game.draw_congratulations(subscreen)
                 
+            # Draw search progress while solving in the background
+            if self.gui_init.searching:
+                self.gui_game.draw_search_progress(subscreen)
+
             # Draw algorithm comparison results if comparing
             if self.gui_init.comparing:
                 self.gui_game.draw_comparison_results(subscreen)
@@ -0,0 +1,156 @@
+from array import array
+from collections import deque
+
+# Thứ tự hướng dùng chung cho bảng láng giềng: lên, xuống, trái, phải
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+DIRECTION_CHARS = "UDLR"
+OPPOSITE = (1, 0, 3, 2)
+# Giá trị trong bảng khoảng cách đẩy khi hộp không thể tới đích
+UNREACHABLE = 0xFFFF
+
+
+class LevelContext:
+    """Phân tích một màn chơi, dựng một lần và dùng chung cho mọi State.
+
+    Chỉ các ô đi được nằm trong vùng liên thông với người chơi mới được đánh
+    số (id 0..n-1), nên mọi bảng tra cứu đều là list phẳng theo id ô.
+    """
+
+    def __init__(self, map_data, player_pos):
+        self.map_data = map_data  # 2D list gốc (chỉ đọc)
+
+        def is_floor(i, j):
+            return 0 <= i < len(map_data) and 0 <= j < len(map_data[i]) and map_data[i][j] != '#'
+
+        # Loang từ người chơi để lấy vùng trong của bản đồ
+        index = {player_pos: 0}
+        cells = [player_pos]
+        queue = deque([player_pos])
+        while queue:
+            i, j = queue.popleft()
+            for dx, dy in DIRECTIONS:
+                nxt = (i + dx, j + dy)
+                if nxt not in index and is_floor(*nxt):
+                    index[nxt] = len(cells)
+                    cells.append(nxt)
+                    queue.append(nxt)
+
+        self.cells = cells  # id -> (hàng, cột)
+        self.index = index  # (hàng, cột) -> id
+        self.size = len(cells)
+        # Độ dài mã hóa gọn của một trạng thái: 2 byte ô người chơi + bitmask hộp
+        self.state_bytes = 2 + (self.size + 7) // 8
+
+        # neighbors[c][k] là id ô kề theo hướng k, hoặc -1 nếu là tường
+        self.neighbors = [
+            tuple(index.get((i + dx, j + dy), -1) for dx, dy in DIRECTIONS)
+            for i, j in cells
+        ]
+
+        self.goals = [c for c, (i, j) in enumerate(cells) if map_data[i][j] == '.']
+        self.goal_mask = sum(1 << c for c in self.goals)
+        self.targets = frozenset(cells[c] for c in self.goals)
+
+        # distances[c * số đích + g]: số lần đẩy ít nhất đưa một hộp từ ô c đến đích g
+        self.distances = self._push_distances()
+        self.dead_mask = self._dead_squares()
+
+    def _side_groups(self):
+        """groups[b][k]: bitmask các phía của ô b người chơi đi vòng tới được
+        từ phía k khi có hộp ở b (0 nếu phía k là tường)"""
+        neighbors = self.neighbors
+        groups = []
+        for b in range(self.size):
+            sides = [0, 0, 0, 0]
+            for k, n in enumerate(neighbors[b]):
+                if n < 0 or sides[k]:
+                    continue
+                region, _ = self.reachable(n, 1 << b)
+                group = 0
+                for k2, n2 in enumerate(neighbors[b]):
+                    if n2 >= 0 and region >> n2 & 1:
+                        group |= 1 << k2
+                for k2 in range(4):
+                    if group >> k2 & 1:
+                        sides[k2] = group
+            groups.append(sides)
+        return groups
+
+    def _push_distances(self):
+        """Bảng khoảng cách đẩy, tính bằng BFS kéo ngược hộp từ từng đích.
+
+        Trạng thái là (ô hộp, phía người chơi đứng); kéo hộp về phía k cần ô
+        sau lưng người chơi cũng đi được, và người chơi chỉ đổi phía được khi
+        đi vòng quanh hộp. Khoảng cách của một ô là min theo các phía, nên vẫn
+        là cận dưới. Ô không tới được đích nào mang giá trị UNREACHABLE.
+        """
+        neighbors = self.neighbors
+        groups = self._side_groups()
+        n_goals = len(self.goals)
+        table = array('H', [UNREACHABLE]) * (self.size * n_goals)
+        for g_index, goal in enumerate(self.goals):
+            dist = [UNREACHABLE] * (self.size * 4)
+            queue = deque()
+
+            def visit(b, k, d):
+                group = groups[b][k]
+                for k2 in range(4):
+                    if group >> k2 & 1 and dist[b * 4 + k2] == UNREACHABLE:
+                        dist[b * 4 + k2] = d
+                        queue.append((b, k2))
+
+            for k in range(4):
+                visit(goal, k, 0)
+            table[goal * n_goals + g_index] = 0
+            while queue:
+                b, k = queue.popleft()
+                d = dist[b * 4 + k]
+                q = neighbors[b][k]
+                r = neighbors[q][k]
+                if r < 0:
+                    continue
+                visit(q, k, d + 1)
+                if d + 1 < table[q * n_goals + g_index]:
+                    table[q * n_goals + g_index] = d + 1
+        return table
+
+    def _dead_squares(self):
+        """Ô mà hộp đặt vào thì không bao giờ về được đích nào (theo bảng đẩy)"""
+        n_goals = len(self.goals)
+        distances = self.distances
+        dead = 0
+        for c in range(self.size):
+            if all(distances[c * n_goals + g] == UNREACHABLE for g in range(n_goals)):
+                dead |= 1 << c
+        return dead
+
+    def reachable(self, player, boxes):
+        """Loang vùng người chơi đi được (không đẩy hộp).
+
+        Trả về (bitmask vùng, id ô nhỏ nhất trong vùng).
+        """
+        neighbors = self.neighbors
+        region = 1 << player
+        canonical = player
+        stack = [player]
+        while stack:
+            c = stack.pop()
+            for n in neighbors[c]:
+                if n >= 0 and not (region | boxes) >> n & 1:
+                    region |= 1 << n
+                    if n < canonical:
+                        canonical = n
+                    stack.append(n)
+        return region, canonical
+
+    def cell(self, i, j):
+        """Đổi tọa độ (hàng, cột) sang id ô"""
+        return self.index[(i, j)]
+
+    @staticmethod
+    def iter_cells(mask):
+        """Liệt kê id các ô có bit bật trong mask"""
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
@@ -1,97 +1,78 @@
+from LevelContext import LevelContext
+from solver.deadlock import freeze_deadlock
+
 
 class State:
-    def __init__(self, player_pos, boxes, map_data):
-        self.player = player_pos  
-        self.boxes = frozenset(boxes)  #Set [(x,y)] dung lam key
-        self.map_data = map_data #2D list
-
-        self.walls = set()
-        for i, row in enumerate(map_data):
-            for j, val in enumerate(row):
-                if val == '#':
-                    self.walls.add((i, j))
-                    
+    __slots__ = ('player', 'boxes', 'level')
+
+    def __init__(self, player, boxes, level):
+        self.player = player  # Id ô của người chơi
+        self.boxes = boxes  # Bitmask các ô có hộp, dùng làm key
+        self.level = level  # LevelContext dùng chung
+
     def is_goal(self):
-        targets = self.get_targets()
-        return all(pos in targets for pos in self.boxes)
-    
+        return self.boxes & ~self.level.goal_mask == 0
+
     def get_targets(self):
-        targets = set()
-        for i, row in enumerate(self.map_data):
-            for j, val in enumerate(row):
-                if val == '.':
-                    targets.add((i,j))
-        return targets
-    
+        return self.level.targets
+
     def __hash__(self):
         return hash((self.player, self.boxes))
-    
+
     def __eq__(self, other):
         return self.player == other.player and self.boxes == other.boxes
 
-    def get_successors(self):
-        """Hàm sinh trạng thái kế tiếp"""
-        successors = []
-        directions = [(-1,0), (1,0), (0,-1), (0,1)] # Lên xuống trái phải
-        rows = len(self.map_data)
-        cols = len(self.map_data[0]) if rows > 0 else 0
+    def pack(self):
+        """Mã hóa trạng thái thành level.state_bytes byte để gửi giữa tiến trình hoặc ghi đĩa"""
+        return self.player.to_bytes(2, 'little') + self.boxes.to_bytes(self.level.state_bytes - 2, 'little')
+
+    @staticmethod
+    def unpack(data, level):
+        """Giải mã bytes từ pack()"""
+        return State(int.from_bytes(data[:2], 'little'), int.from_bytes(data[2:], 'little'), level)
 
-        for dx, dy in directions:
-            px, py = self.player
-            new_px, new_py = px + dx, py + dy
+    def get_successors(self, counters=None):
+        """Hàm sinh trạng thái kế tiếp.
 
-            # Kiểm tra biên trước khi truy cập
-            if new_px < 0 or new_px >= rows or new_py < 0 or new_py >= cols:
-                continue
+        counters: Counters tùy chọn, ghi lại con bị cắt ("dead_square", "freeze").
+        """
+        successors = []
+        level = self.level
+        neighbors = level.neighbors
+        boxes = self.boxes
 
+        for k, new_p in enumerate(neighbors[self.player]):
             # Nếu là tường thì bỏ qua
-            if self.map_data[new_px][new_py] == '#':
+            if new_p < 0:
                 continue
 
-            new_boxes = set(self.boxes)
+            bit = 1 << new_p
             # Nếu ô tiếp theo là hộp
-            if (new_px, new_py) in self.boxes:
-                box_new_x, box_new_y = new_px + dx, new_py + dy
-                
-                # Kiểm tra biên cho hộp
-                if (box_new_x < 0 or box_new_x >= rows or 
-                    box_new_y < 0 or box_new_y >= cols):
-                    continue
-                    
+            if boxes & bit:
+                box_new = neighbors[new_p][k]
                 # Kiểm tra sau hộp là tường hoặc hộp khác
-                if (self.map_data[box_new_x][box_new_y] == '#' or 
-                    (box_new_x, box_new_y) in self.boxes):
+                if box_new < 0 or boxes >> box_new & 1:
                     continue
-
-                new_boxes.remove((new_px, new_py))
-                new_boxes.add((box_new_x, box_new_y))
-                successors.append(State((new_px, new_py), new_boxes, self.map_data))  
+                # Đẩy vào ô chết
+                if level.dead_mask >> box_new & 1:
+                    if counters is not None:
+                        counters.prune("dead_square")
+                    continue
+                new_boxes = boxes ^ bit ^ (1 << box_new)
+                # Bỏ qua nếu hộp vừa đẩy bị đóng băng ngoài đích
+                if freeze_deadlock(level, new_boxes, box_new):
+                    if counters is not None:
+                        counters.prune("freeze")
+                    continue
+                successors.append(State(new_p, new_boxes, level))
             else:
-                successors.append(State((new_px, new_py), new_boxes, self.map_data))
+                successors.append(State(new_p, boxes, level))
 
         return successors
-    
+
     def is_deadlock(self):
-        """Hàm kiểm tra trạng thái deadlock"""
-        rows, cols = len(self.map_data), len(self.map_data[0])
-        for (x, y) in self.boxes:
-            if self.map_data[x][y] == '.':
-                continue  # Không deadlock nếu box đang ở mục tiêu
-            walls = ['#']
-            # Kiểm tra biên trước khi truy cập
-            top = self.map_data[x-1][y] if x > 0 else '#'
-            bottom = self.map_data[x+1][y] if x < rows-1 else '#'
-            left = self.map_data[x][y-1] if y > 0 else '#'
-            right = self.map_data[x][y+1] if y < cols-1 else '#'
-
-            neighbors = [
-                (top, left), (top, right),
-                (bottom, left), (bottom, right)
-            ]
-            for a, b in neighbors:
-                if a in walls and b in walls:
-                    return True  # Bị kẹt góc
-        return False
+        """Hàm kiểm tra trạng thái deadlock (có hộp nằm trên ô chết)"""
+        return self.boxes & self.level.dead_mask != 0
 
     @staticmethod
     def from_game(game):
@@ -119,4 +100,8 @@ class State:
                     new_row.append(char)
             map_data.append(new_row)
 
-        return State(player, boxes, map_data)
+        level = LevelContext(map_data, player)
+        box_mask = 0
+        for i, j in boxes:
+            box_mask |= 1 << level.cell(i, j)
+        return State(level.cell(*player), box_mask, level)
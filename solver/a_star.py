@@ -1,81 +1,132 @@
-from State import State
-from solver.utils import reconstruct_a_star_path
-from heapq import heappush, heappop
-from itertools import count
-import time
-import tracemalloc
+from LevelContext import LevelContext, UNREACHABLE
+from solver.utils import reconstruct_a_star_path, reconstruct_push_path, move_code, push_code
+from solver.push import normalize, push_successors
+from solver.heuristics import BoxMatcher
+from solver.table import StateTable
+from solver.budget import Budget
+from solver.instrument import entry_bytes
+from solver.open_list import IndexedHeap, BucketQueue
 
 def worker_toBox(state):
-    """Tính khoảng cách Manhattan từ người chơi đến thùng gần nhất."""
-    player = state.player
-    boxes = state.boxes
+    """Khoảng cách Manhattan từ người chơi đến thùng gần nhất chưa vào đích, trừ 1.
+
+    Bước cuối cùng đi vào ô thùng cũng là lần đẩy đầu tiên nên không tính hai lần.
+    """
+    level = state.level
+    cells = level.cells
+    px, py = cells[state.player]
     min_dist = float('inf')
-    for box in boxes:
-        dist = abs(player[0] - box[0]) + abs(player[1] - box[1])
+    for box in LevelContext.iter_cells(state.boxes & ~level.goal_mask):
+        bx, by = cells[box]
+        dist = abs(px - bx) + abs(py - by)
         min_dist = min(min_dist, dist)
-    return min_dist if min_dist != float('inf') else 0
+    return min_dist - 1 if min_dist != float('inf') else 0
+
+def box_toDock(state, matcher=None, parent=None):
+    """Cận dưới số lần đẩy: ghép cặp thùng - đích có tổng khoảng cách nhỏ nhất."""
+    if matcher is None:
+        matcher = BoxMatcher(state.level)
+    return matcher.cost(state, parent)
 
-def box_toDock(state):
-    """Tính tổng khoảng cách Manhattan từ mỗi thùng đến đích gần nhất."""
+def box_toNearest(state, matcher=None, parent=None):
+    """Cận dưới số lần đẩy rẻ hơn: mỗi thùng tới đích gần nhất, không ghép cặp."""
+    level = state.level
+    n = len(level.goals)
+    distances = level.distances
     total = 0
-    targets = state.get_targets()
-    boxes = state.boxes
-    for box in boxes:
-        if box in targets:
-            continue
-        min_dis = float('inf')
-        for target in targets:
-            dis = abs(box[0] - target[0]) + abs(box[1] - target[1])
-            min_dis = min(min_dis, dis)
-        total += min_dis
+    for box in LevelContext.iter_cells(state.boxes & ~level.goal_mask):
+        d = min(distances[box * n:(box + 1) * n])
+        if d == UNREACHABLE:
+            return float('inf')
+        total += d
     return total
 
-def heuristic(state):
+def heuristic(state, matcher=None, parent=None):
     """Heuristic kết hợp worker_toBox và box_toDock."""
-    return worker_toBox(state) + box_toDock(state)
+    return worker_toBox(state) + box_toDock(state, matcher, parent)
 
 
-def a_star(start_state):
-    tracemalloc.start()
-    open_set = []  
-    closed_set = set()  
-    came_from = {}  
-    g_score = {start_state: 0} 
-    f_score = {start_state: heuristic(start_state)}  
+def a_star(start_state, push=False, weight=1, h=None, compact=False, buckets=False, budget=None):
+    """push=True: tìm theo số lần đẩy hộp, chi phí g là số lần đẩy.
+
+    weight > 1: weighted A* (f = g + weight * h), nhanh hơn nhưng không còn bảo
+    đảm tối ưu. h: thay heuristic mặc định của từng chế độ. compact=True:
+    closed_set và g_score dùng StateTable thay cho set/dict. buckets=True: open
+    set là BucketQueue theo f nguyên, cùng f thì lấy h nhỏ nhất, vào sau ra
+    trước (cần weight nguyên). budget: Budget giới hạn lần tìm, hết thì trả về
+    BudgetExceeded.
+    """
+    if buckets:
+        if weight != int(weight):
+            raise ValueError("buckets=True cần weight nguyên")
+        weight = int(weight)
+    origin = start_state
+    if push:
+        start_state = normalize(start_state)
+    if h is None:
+        h = box_toDock if push else heuristic  # worker_toBox không chấp nhận được khi tính theo lần đẩy
+    matcher = BoxMatcher(start_state.level)
+    # Mỗi trạng thái có mặt một lần, g tốt hơn thì giảm khóa
+    open_set = BucketQueue() if buckets else IndexedHeap()
+    closed_set = StateTable(start_state.level) if compact else set()
+    g_score = StateTable(start_state.level) if compact else {}
+    g_score[start_state] = 0
+    # Mã bước (hoặc mã đẩy) dẫn tới mỗi trạng thái, thay cho map state cha
+    moves = {}
+    move_of = g_score.move if compact else moves.get
     node_count = 0  
-    counter = count()  
-    start_time = time.time()
+    budget = budget or Budget()
+    counters = budget.counters
+    # closed_set, g_score, moves (hoặc hai StateTable) cho mỗi trạng thái
+    instrument = budget.instrument
+    instrument.start(entry_bytes(start_state, 2 if compact else 3, compact), open_set.entry_bytes)
 
-    heappush(open_set, (f_score[start_state], 0, next(counter), start_state))
+    # h vô hạn: không thể đưa đủ hộp vào đích, không đưa vào open set
+    h_start = h(start_state, matcher)
+    if h_start != float('inf'):
+        if buckets:
+            open_set.push(start_state, weight * h_start, h_start)
+        else:
+            open_set.push(start_state, weight * h_start)
 
     while open_set:
-        _, _, current = heappop(open_set)
-        if current in closed_set:  
-            continue
+        reason = budget.check(node_count, len(g_score), frontier=len(open_set), best_f=open_set.min_key())
+        if reason:
+            return budget.exceeded(reason, node_count, len(g_score))
+        current = open_set.pop()
         closed_set.add(current)  
         node_count += 1
 
         if current.is_goal():
-            end_time = time.time()
-            current_mem, peak_mem = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
-            print("A* Success")
-            print("Node count:", node_count)
-            print("Time:", round(end_time - start_time, 4), "s")
-            print("Path length:", g_score[current])
-            print("Memory used:", round(current_mem / 1024, 2), "KB")
-            print("Memory peak:", round(peak_mem / 1024, 2), "KB")
-            return reconstruct_a_star_path(current, came_from, g_score)
+            if push:
+                return budget.finish(reconstruct_push_path(current, move_of, origin), node_count, len(g_score))
+            return budget.finish(reconstruct_a_star_path(current, move_of, g_score), node_count, len(g_score))
+
+        if push:
+            successors = push_successors(current, counters)
+        else:
+            successors = ((None, neighbor) for neighbor in current.get_successors(counters))
 
-        for neighbor in current.get_successors(): 
-            if neighbor.is_deadlock() or neighbor in closed_set:  
+        for move, neighbor in successors: 
+            counters.generated += 1
+            if neighbor in closed_set:
+                counters.duplicates += 1
                 continue
             tentative_g = g_score[current] + 1  
             if neighbor not in g_score or tentative_g < g_score[neighbor]:
-                came_from[neighbor] = current
-                g_score[neighbor] = tentative_g
-                f_score[neighbor] = tentative_g + heuristic(neighbor)
-                heappush(open_set, (f_score[neighbor], next(counter), neighbor))
-    tracemalloc.stop()
-    print("A* failed: no solution found.")
-    return None
+                code = push_code(move) if push else move_code(current, neighbor)
+                if compact:
+                    g_score.put(neighbor, tentative_g, code)
+                else:
+                    g_score[neighbor] = tentative_g
+                    moves[neighbor] = code
+                h_value = h(neighbor, matcher, current)
+                if h_value == float('inf'):
+                    counters.prune("unreachable")
+                elif buckets:
+                    open_set.push(neighbor, tentative_g + weight * h_value, h_value)
+                else:
+                    open_set.push(neighbor, tentative_g + weight * h_value)
+            else:
+                counters.duplicates += 1
+    return budget.finish(None, node_count, len(g_score))
@@ -0,0 +1,142 @@
+from solver.utils import reconstruct_a_star_path, reconstruct_push_path, move_code, push_code
+from solver.push import normalize, push_successors
+from solver.heuristics import BoxMatcher
+from solver.a_star import heuristic, box_toDock
+from solver.budget import Budget
+from solver.table import StateTable
+from heapq import heappush, heappop, heapify
+from itertools import count
+
+
+def ara_star(start_state, push=False, weight=3.0, step=0.5, time_limit=None, on_solution=None, compact=False,
+             budget=None):
+    """Anytime Repairing A* (ARA*).
+
+    Tìm nhanh một lời giải với f = g + weight * h, sau đó giảm weight theo step
+    và sửa tiếp trên chính open set cũ (các trạng thái bị cập nhật sau khi đã
+    đóng được giữ trong danh sách incons rồi đưa lại vào open). Mỗi lời giải tốt
+    hơn (ngắn hơn lời giải đã báo) được trả qua on_solution(path, directions,
+    weight). Dừng khi weight về 1 (lời giải tối ưu đã được chứng minh) hoặc hết
+    time_limit giây / budget (chỉ truyền một trong hai); trả về lời giải tốt
+    nhất, None nếu không có lời giải, hoặc BudgetExceeded nếu dừng sớm trước
+    lời giải đầu tiên. Dừng sớm sau khi đã có lời giải thì lời giải vẫn được
+    trả về nhưng stats.status là lý do dừng ("time", "cancelled", ...) thay
+    cho "solved": lời giải chưa được chứng minh tối ưu. compact=True: closed_set và g_score (kèm mã bước) dùng
+    StateTable thay cho set/dict.
+    """
+    if budget is not None and time_limit is not None:
+        raise ValueError("Chỉ truyền time_limit hoặc budget (đặt time_limit trong Budget)")
+    budget = budget or Budget(time_limit=time_limit)
+    counters = budget.counters
+    stop_reason = None
+    origin = start_state
+    h = heuristic
+    if push:
+        start_state = normalize(start_state)
+        h = box_toDock
+    matcher = BoxMatcher(start_state.level)
+
+    level = start_state.level
+    g_score = StateTable(level) if compact else {}
+    g_score[start_state] = 0
+    h_score = {start_state: h(start_state, matcher)}
+    moves = {}  # Mã bước (hoặc mã đẩy) dẫn tới mỗi trạng thái
+    move_of = g_score.move if compact else moves.get
+    counter = count()
+    open_set = {start_state}
+    closed_set = StateTable(level) if compact else set()
+    incons = set()
+    best_goal = None
+    best = None
+    best_cost = float('inf')
+    best_length = float('inf')  # Độ dài (số lần đẩy hoặc số bước) của lời giải tốt nhất đã dựng
+    node_count = 0
+
+    def key(state):
+        return g_score[state] + weight * h_score[state]
+
+    heap = [(key(start_state), next(counter), start_state)]
+
+    def goal_cost():
+        return g_score[best_goal] if best_goal is not None else float('inf')
+
+    def improve_path():
+        """Mở rộng cho tới khi không còn trạng thái nào có key nhỏ hơn lời giải hiện có"""
+        nonlocal best_goal, node_count, stop_reason
+        while heap and heap[0][0] < goal_cost():
+            stop_reason = budget.check(node_count, len(g_score), frontier=len(open_set), best_f=heap[0][0])
+            if stop_reason:
+                return False
+            _, _, current = heappop(heap)
+            if current not in open_set:
+                continue  # Mục cũ trong heap
+            open_set.discard(current)
+            closed_set.add(current)
+            node_count += 1
+
+            if current.is_goal():
+                if g_score[current] < goal_cost():
+                    best_goal = current
+                continue
+
+            if push:
+                successors = push_successors(current, counters)
+            else:
+                successors = ((None, neighbor) for neighbor in current.get_successors(counters))
+
+            tentative_g = g_score[current] + 1
+            for move, neighbor in successors:
+                counters.generated += 1
+                if neighbor in g_score and tentative_g >= g_score[neighbor]:
+                    counters.duplicates += 1
+                    continue
+                code = push_code(move) if push else move_code(current, neighbor)
+                if compact:
+                    g_score.put(neighbor, tentative_g, code)
+                else:
+                    g_score[neighbor] = tentative_g
+                    moves[neighbor] = code
+                if neighbor not in h_score:
+                    h_score[neighbor] = h(neighbor, matcher, current)
+                if neighbor in closed_set:
+                    incons.add(neighbor)
+                else:
+                    open_set.add(neighbor)
+                    heappush(heap, (key(neighbor), next(counter), neighbor))
+        return True
+
+    while True:
+        finished = improve_path()
+        if goal_cost() < best_cost:
+            best_cost = goal_cost()
+            if push:
+                solution = reconstruct_push_path(best_goal, move_of, origin)
+                length = sum(1 for a, b in zip(solution[0], solution[0][1:]) if a.boxes != b.boxes)
+            else:
+                solution = reconstruct_a_star_path(best_goal, move_of, g_score)
+                length = len(solution[1])
+            # g giảm chưa chắc lời giải dựng lại ngắn hơn: chỉ nhận và báo khi có tiến bộ
+            if length < best_length:
+                best, best_length = solution, length
+                if on_solution is not None:
+                    on_solution(best[0], best[1], weight)
+        if not finished or weight <= 1.0:
+            break
+
+        # Cận dưới hiện tại cho biết weight còn cần giảm tới đâu
+        pending = open_set | incons
+        lower = min((g_score[s] + h_score[s] for s in pending), default=float('inf'))
+        if goal_cost() <= lower:
+            break  # Lời giải hiện có đã tối ưu
+        weight = max(1.0, weight - step)
+
+        # Dùng lại open set: gộp incons vào, tính lại key theo weight mới
+        open_set |= incons
+        incons.clear()
+        closed_set = StateTable(level) if compact else set()
+        heap = [(key(s), next(counter), s) for s in open_set]
+        heapify(heap)
+
+    if best is None and stop_reason:
+        return budget.exceeded(stop_reason, node_count, len(g_score))
+    return budget.finish(best, node_count, len(g_score), stop_reason)
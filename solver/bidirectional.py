@@ -0,0 +1,149 @@
+from itertools import combinations
+from State import State
+from LevelContext import LevelContext, OPPOSITE
+from solver.push import normalize, push_successors, expand_pushes
+from solver.utils import push_code, undo_push, apply_push
+from solver.table import StateTable
+from solver.budget import Budget
+
+
+def goal_states(level, box_count):
+    """Mọi cấu hình cuối: hộp nằm trên đích, người chơi ở từng vùng trống có thể"""
+    states = []
+    for goal_cells in combinations(level.goals, box_count):
+        boxes = sum(1 << g for g in goal_cells)
+        covered = boxes
+        for c in range(level.size):
+            if covered >> c & 1:
+                continue
+            region, canonical = level.reachable(c, boxes)
+            covered |= region
+            states.append(State(canonical, boxes, level))
+    return states
+
+
+def pull_successors(state):
+    """Sinh trạng thái trước đó bằng cách kéo ngược một hộp.
+
+    Trả về list (pull, State) với pull = (ô hộp, hướng kéo): người chơi ở ô kề
+    hộp theo hướng kéo lùi thêm một bước, hộp đi theo vào ô người chơi vừa đứng.
+    """
+    level = state.level
+    neighbors = level.neighbors
+    boxes = state.boxes
+    region, _ = level.reachable(state.player, boxes)
+    predecessors = []
+    for box in LevelContext.iter_cells(boxes):
+        for k in range(4):
+            q = neighbors[box][k]
+            if q < 0 or not region >> q & 1:
+                continue
+            r = neighbors[q][k]
+            if r < 0 or boxes >> r & 1:
+                continue
+            new_boxes = boxes ^ (1 << box) ^ (1 << q)
+            _, canonical = level.reachable(r, new_boxes)
+            predecessors.append(((box, k), State(canonical, new_boxes, level)))
+    return predecessors
+
+
+def bidirectional(start_state, compact=False, budget=None):
+    """Tìm hai chiều: đẩy xuôi từ trạng thái đầu, kéo ngược từ các trạng thái đích.
+
+    Mỗi lượt mở rộng trọn một tầng của phía có biên nhỏ hơn; dừng khi hai phía
+    gặp nhau ở cùng cấu hình hộp và cùng vùng người chơi (cùng ô đại diện).
+    compact=True: hai bảng trạng thái dùng StateTable thay cho dict. budget:
+    Budget giới hạn lần tìm, hết thì trả về BudgetExceeded.
+    """
+    level = start_state.level
+    start = normalize(start_state)
+    box_count = bin(start.boxes).count("1")
+
+    # Mã đẩy (solver.utils) cho mỗi trạng thái: phía xuôi là lần đẩy dẫn tới nó,
+    # phía ngược là lần đẩy đưa nó về phía đích (lần kéo đảo lại); None ở hai đầu
+    forward = StateTable(level) if compact else {}
+    backward = StateTable(level) if compact else {}
+    record_forward = forward.record if compact else forward.__setitem__
+    record_backward = backward.record if compact else backward.__setitem__
+    forward_of = forward.move if compact else forward.get
+    backward_of = backward.move if compact else backward.get
+    record_forward(start, None)
+    goals = goal_states(level, box_count)
+    for goal in goals:
+        record_backward(goal, None)
+    forward_frontier = [start]
+    backward_frontier = goals
+    node_count = 0
+    budget = budget or Budget()
+    counters = budget.counters
+    reason = None
+
+    meet = start if start in backward else None
+    while meet is None and not reason and forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            next_frontier = []
+            for state in forward_frontier:
+                reason = budget.check(node_count, len(forward) + len(backward), frontier=len(forward_frontier))
+                if reason:
+                    break
+                node_count += 1
+                for push, child in push_successors(state, counters):
+                    counters.generated += 1
+                    if child in forward:
+                        counters.duplicates += 1
+                        continue
+                    record_forward(child, push_code(push))
+                    if child in backward:
+                        meet = child
+                        break
+                    next_frontier.append(child)
+                if meet is not None:
+                    break
+            forward_frontier = next_frontier
+        else:
+            next_frontier = []
+            for state in backward_frontier:
+                reason = budget.check(node_count, len(forward) + len(backward), frontier=len(backward_frontier))
+                if reason:
+                    break
+                node_count += 1
+                for pull, child in pull_successors(state):
+                    counters.generated += 1
+                    if child in backward:
+                        counters.duplicates += 1
+                        continue
+                    # Kéo (hộp b, hướng k) đảo lại là đẩy hộp ở ô kề theo hướng ngược
+                    box, k = pull
+                    record_backward(child, push_code((level.neighbors[box][k], OPPOSITE[k])))
+                    if child in forward:
+                        meet = child
+                        break
+                    next_frontier.append(child)
+                if meet is not None:
+                    break
+            backward_frontier = next_frontier
+
+    if reason:
+        return budget.exceeded(reason, node_count, len(forward) + len(backward))
+    if meet is None:
+        return budget.finish(None, node_count, len(forward) + len(backward))
+
+    # Nửa xuôi: lùi theo mã đẩy từ điểm gặp về trạng thái đầu
+    pushes = []
+    state = meet
+    code = forward_of(state)
+    while code is not None:
+        pushes.append(divmod(code, 4))
+        state = undo_push(state, code)
+        code = forward_of(state)
+    pushes.reverse()
+
+    # Nửa ngược: tiến theo mã đẩy từ điểm gặp tới trạng thái đích
+    state = meet
+    code = backward_of(state)
+    while code is not None:
+        pushes.append(divmod(code, 4))
+        state = apply_push(state, code)
+        code = backward_of(state)
+
+    return budget.finish(expand_pushes(start_state, pushes), node_count, len(forward) + len(backward))
@@ -0,0 +1,151 @@
+import threading
+import time
+from solver.events import Counters, ProgressEvent
+from solver.instrument import Instrument, COUNTERS
+from solver.stats import SolverStats, Solution
+
+# Số lần kiểm tra giữa hai lần đọc đồng hồ
+CHECK_INTERVAL = 256
+# Khoảng thời gian tối thiểu (giây) giữa hai ProgressEvent gửi cho listener
+PROGRESS_INTERVAL = 0.25
+
+
+class CancelToken:
+    """Cờ hủy dùng chung giữa luồng giao diện và luồng giải"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+class BudgetExceeded:
+    """Kết quả khi solver dừng sớm vì hết ngân sách hoặc bị hủy.
+
+    reason: "cancelled", "time", "nodes" hoặc "states"; stats: SolverStats tới
+    lúc dừng. Luôn là False khi kiểm tra `if result:` nên nơi gọi cũ coi như không
+    có lời giải.
+    """
+    __slots__ = ('reason', 'stats')
+
+    def __init__(self, reason, stats):
+        self.reason = reason
+        self.stats = stats
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return f"BudgetExceeded({self.reason!r}, {self.stats!r})"
+
+
+class Budget:
+    """Giới hạn cho một lần giải: thời gian (giây), số nút mở rộng, số trạng thái lưu.
+
+    None là không giới hạn. token: CancelToken tùy chọn. Đồng hồ chạy từ lúc tạo
+    (gọi start() để đặt lại); solver gọi check(nodes, states) mỗi vòng lặp, đồng
+    hồ chỉ được đọc mỗi CHECK_INTERVAL lần nên lần kiểm tra rất rẻ. Mỗi lần đọc
+    đồng hồ, progress (ProgressEvent) được cập nhật để luồng khác (ví dụ giao
+    diện) hiển thị, và listener(event) được gọi nếu đã qua progress_interval
+    giây kể từ lần gọi trước. Solver tăng các bộ đếm trong counters và gọi
+    finish() ở lối ra để có SolverStats (self.stats).
+    instrument: chế độ đo bộ nhớ (xem solver.instrument), mẫu cũng lấy ở các
+    lần đọc đồng hồ.
+    """
+
+    def __init__(self, time_limit=None, max_nodes=None, max_states=None, token=None,
+                 listener=None, progress_interval=PROGRESS_INTERVAL, instrument=COUNTERS):
+        self.time_limit = time_limit
+        self.max_nodes = max_nodes
+        self.max_states = max_states
+        self.token = token
+        self.listener = listener
+        self.progress_interval = progress_interval
+        self.instrument = Instrument(instrument)
+        self.start()
+
+    def start(self):
+        self.calls = 0
+        self.nodes = 0
+        self.states = 0
+        self.peak_open = 0
+        self.peak_closed = 0
+        self.progress = None
+        self.stats = None
+        self.counters = Counters()
+        self.start_time = time.perf_counter()
+        self.start_cpu = time.process_time()
+        self.worker_cpu = 0.0  # Thời gian CPU của các tiến trình con đã báo về
+        self.last_event = self.start_time
+        self.deadline = self.start_time + self.time_limit if self.time_limit is not None else None
+
+    def check(self, nodes, states=0, interval=CHECK_INTERVAL, frontier=None, best_f=None):
+        """Lý do phải dừng, hoặc None nếu còn ngân sách.
+
+        interval: đọc đồng hồ mỗi interval lần gọi (1 cho vòng lặp điều phối chậm).
+        frontier, best_f: kích thước biên và f nhỏ nhất hiện tại, chỉ để báo tiến độ.
+        """
+        self.calls += 1
+        self.nodes = nodes
+        self.states = states
+        if states > self.peak_closed:
+            self.peak_closed = states
+        if frontier is not None and frontier > self.peak_open:
+            self.peak_open = frontier
+        if self.token is not None and self.token.cancelled:
+            return "cancelled"
+        if self.max_nodes is not None and nodes >= self.max_nodes:
+            return "nodes"
+        if self.max_states is not None and states >= self.max_states:
+            return "states"
+        if self.calls % interval == 0:
+            now = time.perf_counter()
+            self.progress = self.snapshot(nodes, states, frontier, best_f, now)
+            self.instrument.sample(states, frontier)
+            if self.listener is not None and now - self.last_event >= self.progress_interval:
+                self.last_event = now
+                self.listener(self.progress)
+            if self.deadline is not None and now > self.deadline:
+                return "time"
+        return None
+
+    def snapshot(self, nodes, states=0, frontier=None, best_f=None, now=None):
+        """ProgressEvent cho các bộ đếm hiện tại"""
+        elapsed = (now or time.perf_counter()) - self.start_time
+        counters = self.counters
+        return ProgressEvent(nodes, counters.generated, counters.duplicates, dict(counters.pruned),
+                             states, frontier, best_f, elapsed, nodes / elapsed if elapsed > 0 else 0)
+
+    def add_worker(self, counters, cpu_time):
+        """Cộng bộ đếm và thời gian CPU của một tiến trình con (gọi trước finish)"""
+        self.counters.add(counters)
+        self.worker_cpu += cpu_time
+
+    def finish(self, result, nodes, states=0, status=None):
+        """Dừng đo bộ nhớ và ghi SolverStats vào self.stats.
+
+        result: (path, directions) hoặc None; có lời giải thì trả về Solution
+        mang stats, không thì trả về result. status mặc định theo result.
+        """
+        wall_time = time.perf_counter() - self.start_time
+        cpu_time = time.process_time() - self.start_cpu + self.worker_cpu
+        self.instrument.stop(states)
+        counters = self.counters
+        if status is None:
+            status = "solved" if result else "failed"
+        self.stats = SolverStats(status, nodes, counters.generated, counters.duplicates, dict(counters.pruned),
+                                 self.peak_open, max(self.peak_closed, states), wall_time, cpu_time,
+                                 self.instrument.peak, len(result[1]) if result else 0)
+        if result:
+            return Solution(result[0], result[1], self.stats)
+        return result
+
+    def exceeded(self, reason, nodes, states=0):
+        """BudgetExceeded kèm SolverStats tới lúc dừng"""
+        self.finish(None, nodes, states, reason)
+        return BudgetExceeded(reason, self.stats)
@@ -0,0 +1,136 @@
+from collections import deque
+from LevelContext import LevelContext, OPPOSITE
+from solver.deadlock import freeze_deadlock
+from solver.patterns import get_database
+
+# Giới hạn số nút cho tìm kiếm con khi chứng minh corral deadlock
+CORRAL_SEARCH_LIMIT = 300
+
+
+def find_corrals(level, region, boxes):
+    """Tách các corral: vùng ô trống người chơi không tới được.
+
+    Trả về list (bitmask ô của corral, bitmask hộp viền corral).
+    """
+    neighbors = level.neighbors
+    seen = region | boxes
+    corrals = []
+    for start in range(level.size):
+        if seen >> start & 1:
+            continue
+        cells = 1 << start
+        edge = 0
+        seen |= 1 << start
+        stack = [start]
+        while stack:
+            c = stack.pop()
+            for n in neighbors[c]:
+                if n < 0:
+                    continue
+                if boxes >> n & 1:
+                    edge |= 1 << n
+                elif not seen >> n & 1:
+                    seen |= 1 << n
+                    cells |= 1 << n
+                    stack.append(n)
+        corrals.append((cells, edge))
+    return corrals
+
+
+def _corral_pushes(level, region, boxes, cells, edge):
+    """Các lần đẩy hộp viền corral, hoặc None nếu corral không phải PI-corral"""
+    neighbors = level.neighbors
+    blocked = boxes | level.dead_mask
+    pushes = []
+    for box in LevelContext.iter_cells(edge):
+        touches_region = False
+        for k in range(4):
+            behind = neighbors[box][OPPOSITE[k]]
+            if behind < 0 or not region >> behind & 1:
+                continue
+            touches_region = True
+            dest = neighbors[box][k]
+            if dest < 0 or blocked >> dest & 1:
+                continue
+            # Điều kiện I: mọi lần đẩy hợp lệ đều phải đi vào corral
+            if not cells >> dest & 1:
+                return None
+            pushes.append((box, k))
+        # Điều kiện P: người chơi phải tới được mọi hộp viền
+        if not touches_region:
+            return None
+    return pushes
+
+
+def _is_solved(level, boxes, cells, edge):
+    goal_mask = level.goal_mask
+    if edge & ~goal_mask:
+        return False
+    # Chỉ khi số hộp bằng số đích thì đích trống trong corral mới là chưa xong
+    if bin(boxes).count("1") == len(level.goals) and cells & goal_mask & ~boxes:
+        return False
+    return True
+
+
+def corral_deadlock(level, player, boxes, cells, edge, limit=CORRAL_SEARCH_LIMIT):
+    """Chứng minh corral không thể giải bằng tìm kiếm con giới hạn.
+
+    Chỉ giữ các hộp viền corral (bỏ hộp khác là nới lỏng bài toán). Nếu không
+    thể đưa mọi hộp corral vào đích cũng như không mở được corral cho người
+    chơi thì trạng thái gốc là deadlock. Hết giới hạn nút thì coi như không chứng
+    minh được.
+    """
+    neighbors = level.neighbors
+    goal_mask = level.goal_mask
+    region, canonical = level.reachable(player, edge)
+    visited = {(canonical, edge)}
+    queue = deque([(region, edge)])
+    while queue:
+        region, sub_boxes = queue.popleft()
+        if region & cells or not sub_boxes & ~goal_mask:
+            return False
+        if len(visited) > limit:
+            return False
+        blocked = sub_boxes | level.dead_mask
+        for box in LevelContext.iter_cells(sub_boxes):
+            for k in range(4):
+                behind = neighbors[box][OPPOSITE[k]]
+                if behind < 0 or not region >> behind & 1:
+                    continue
+                dest = neighbors[box][k]
+                if dest < 0 or blocked >> dest & 1:
+                    continue
+                new_boxes = sub_boxes ^ (1 << box) ^ (1 << dest)
+                if freeze_deadlock(level, new_boxes, dest):
+                    continue
+                new_region, new_canonical = level.reachable(box, new_boxes)
+                key = (new_canonical, new_boxes)
+                if key not in visited:
+                    visited.add(key)
+                    queue.append((new_region, new_boxes))
+    return True
+
+
+def pi_corral_pushes(level, player, region, boxes):
+    """Phân tích corral cho bộ sinh lần đẩy.
+
+    Trả về None nếu không có PI-corral chưa giải (không giới hạn gì), list rỗng
+    nếu corral đã được chứng minh deadlock, ngược lại là các lần đẩy vào
+    PI-corral nhỏ nhất mà bộ sinh chỉ cần xét.
+    """
+    best = None
+    for cells, edge in find_corrals(level, region, boxes):
+        if _is_solved(level, boxes, cells, edge):
+            continue
+        pushes = _corral_pushes(level, region, boxes, cells, edge)
+        if not pushes:
+            continue
+        if corral_deadlock(level, player, boxes, cells, edge):
+            # Học mẫu cục bộ quanh các hộp viền để lần sau cắt ngay khi sinh
+            patterns = get_database()
+            for box in LevelContext.iter_cells(edge):
+                patterns.learn(level, boxes, box, region, cells)
+            return []
+        if best is None or len(pushes) < len(best):
+            best = pushes
+    return best
@@ -0,0 +1,41 @@
+# Cặp hướng theo từng trục: dọc (lên, xuống) và ngang (trái, phải)
+AXES = ((0, 1), (2, 3))
+
+
+def _axis_blocked(level, boxes, c, axis, frozen, visiting):
+    neighbors = level.neighbors[c]
+    a, b = neighbors[axis[0]], neighbors[axis[1]]
+    # Có tường ở một phía
+    if a < 0 or b < 0:
+        return True
+    # Cả hai phía đều là ô chết thì hộp không thể đi theo trục này
+    dead = level.dead_mask
+    if dead >> a & 1 and dead >> b & 1:
+        return True
+    # Hộp bên cạnh đang xét (coi như tường) hoặc cũng bị đóng băng
+    for n in (a, b):
+        if boxes >> n & 1 and (n in visiting or _is_frozen(level, boxes, n, frozen, visiting)):
+            return True
+    return False
+
+
+def _is_frozen(level, boxes, c, frozen, visiting):
+    visiting.add(c)
+    result = all(_axis_blocked(level, boxes, c, axis, frozen, visiting) for axis in AXES)
+    if result:
+        frozen.add(c)
+    return result
+
+
+def freeze_deadlock(level, boxes, moved_box):
+    """Kiểm tra freeze deadlock quanh hộp vừa đẩy.
+
+    Hộp bị đóng băng khi cả trục dọc lẫn trục ngang đều bị chặn bởi tường hoặc
+    hộp đóng băng khác. Deadlock nếu cụm hộp đóng băng có hộp nằm ngoài đích.
+    """
+    frozen = set()
+    if not _is_frozen(level, boxes, moved_box, frozen, set()):
+        return False
+    goal_mask = level.goal_mask
+    return any(not goal_mask >> c & 1 for c in frozen)
+
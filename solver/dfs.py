@@ -1,47 +1,63 @@
 from collections import deque
-from solver.utils import reconstruct_path
-import time
-import tracemalloc
-
-def dfs(start_state):
-    visited = set()
+from solver.utils import reconstruct_path, reconstruct_push_path, move_code, push_code
+from solver.push import normalize, push_successors
+from solver.table import StateTable
+from solver.budget import Budget
+from solver.instrument import entry_bytes
+
+def dfs(start_state, push=False, compact=False, budget=None):
+    """push=True: mỗi bước mở rộng là một lần đẩy hộp, người chơi được chuẩn hóa theo vùng.
+
+    compact=True: visited dùng StateTable (mảng kiểu cố định) thay cho dict.
+    budget: Budget giới hạn thời gian/số nút/số trạng thái, hết thì trả về BudgetExceeded.
+    """
+    # visited: state -> mã bước (hoặc mã đẩy) dẫn tới nó, thay cho map state cha
+    visited = StateTable(start_state.level) if compact else dict()
+    record = visited.record if compact else visited.__setitem__
+    move_of = visited.move if compact else visited.get
     stack = deque()
-    parent = dict()
     node_count = 0
+    budget = budget or Budget()
+    counters = budget.counters
+
+    instrument = budget.instrument  # Đo bộ nhớ theo chế độ của budget, mặc định chỉ ước lượng
+    instrument.start(entry_bytes(start_state, compact=compact))
 
-    tracemalloc.start()
-    start_time = time.time()
+    origin = start_state
+    if push:
+        start_state = normalize(start_state)
 
     stack.append(start_state)
-    visited.add(start_state)
-    parent[start_state]  = None
+    record(start_state, None)
 
     while stack:
+        reason = budget.check(node_count, len(visited), frontier=len(stack))
+        if reason:
+            return budget.exceeded(reason, node_count, len(visited))
         current = stack.pop()
         node_count+=1
 
 
         if current.is_goal():
-            end_time = time.time()
-            mem_current, mem_peak = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
-            print("DFS Completed")
-            print("Node count:", node_count)
-            print("Execution time:", round(end_time - start_time, 4), "seconds")
-            print("Memory used:", round(mem_current / 1024, 2), "KB")
-            print("Memory peak:", round(mem_peak / 1024, 2), "KB")
-            return reconstruct_path(current, parent)
-
-        if current.is_deadlock():
-            continue
-
-        for next_state in current.get_successors(): 
-            if next_state not in visited:
-                visited.add(next_state)
-                parent[next_state] = current
+            if push:
+                return budget.finish(reconstruct_push_path(current, move_of, origin), node_count, len(visited))
+            return budget.finish(reconstruct_path(current, move_of), node_count, len(visited))
+
+        if push:
+            for move, next_state in push_successors(current, counters):
+                counters.generated += 1
+                if next_state in visited:
+                    counters.duplicates += 1
+                    continue
+                record(next_state, push_code(move))
+                stack.append(next_state)
+        else:
+            for next_state in current.get_successors(counters):
+                counters.generated += 1
+                if next_state in visited:
+                    counters.duplicates += 1
+                    continue
+                record(next_state, move_code(current, next_state))
                 stack.append(next_state)
 
-    tracemalloc.stop()
-    print("No solution found.")
-    print("Node count:", node_count)
-    return None
+    return budget.finish(None, node_count, len(visited))
@@ -0,0 +1,65 @@
+class Counters:
+    """Bộ đếm solver tăng trong vòng lặp chính (thuộc về Budget của lần giải).
+
+    pruned: số trạng thái bị cắt theo lý do, ví dụ {"dead_square": 12, "freeze": 3}.
+    """
+    __slots__ = ('generated', 'duplicates', 'pruned')
+
+    def __init__(self):
+        self.generated = 0
+        self.duplicates = 0
+        self.pruned = {}
+
+    def prune(self, reason):
+        self.pruned[reason] = self.pruned.get(reason, 0) + 1
+
+    def add(self, other):
+        """Cộng bộ đếm của một lần giải khác (ví dụ của tiến trình con)"""
+        self.generated += other.generated
+        self.duplicates += other.duplicates
+        for reason, n in other.pruned.items():
+            self.pruned[reason] = self.pruned.get(reason, 0) + n
+
+
+class ProgressEvent:
+    """Ảnh chụp tiến độ định kỳ của một lần giải"""
+    __slots__ = ('expanded', 'generated', 'duplicates', 'pruned', 'states', 'frontier', 'best_f', 'time', 'rate')
+    kind = "progress"
+
+    def __init__(self, expanded, generated, duplicates, pruned, states, frontier, best_f, time, rate):
+        self.expanded = expanded
+        self.generated = generated
+        self.duplicates = duplicates
+        self.pruned = pruned  # Bản sao dict lý do -> số lần
+        self.states = states
+        self.frontier = frontier  # None nếu solver không báo
+        self.best_f = best_f  # None nếu solver không có f
+        self.time = time
+        self.rate = rate  # Số nút mở rộng mỗi giây
+
+    def __repr__(self):
+        return (f"ProgressEvent(expanded={self.expanded}, generated={self.generated}, "
+                f"duplicates={self.duplicates}, pruned={self.pruned}, frontier={self.frontier}, "
+                f"best_f={self.best_f}, rate={self.rate:.0f}/s)")
+
+
+class SolutionEvent:
+    """Sự kiện cuối của một lần giải.
+
+    result: Solution (path, directions), None nếu không có lời giải, hoặc
+    BudgetExceeded. stats: SolverStats của lần giải.
+    """
+    __slots__ = ('solver', 'result', 'stats')
+    kind = "solution"
+
+    def __init__(self, solver, result, stats):
+        self.solver = solver
+        self.result = result
+        self.stats = stats
+
+    @property
+    def solved(self):
+        return bool(self.result)
+
+    def __repr__(self):
+        return f"SolutionEvent({self.solver!r}, solved={self.solved}, {self.stats!r})"
@@ -0,0 +1,145 @@
+import os
+import mmap
+import shutil
+import tempfile
+from heapq import merge
+from State import State
+from solver.utils import reconstruct_path, reconstruct_push_path, path_codes
+from solver.push import normalize, push_successors
+from solver.budget import Budget
+
+# Số trạng thái con giữ trong RAM trước khi sắp xếp và ghi thành một run
+CHUNK_SIZE = 1 << 16
+
+
+def _records(path, width):
+    """Đọc lần lượt các bản ghi cố định width byte của một file qua mmap"""
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for offset in range(0, len(data), width):
+            yield data[offset:offset + width]
+
+
+def _unique(records):
+    """Bỏ bản ghi trùng liên tiếp trong một dòng đã sắp xếp"""
+    last = None
+    for record in records:
+        if record != last:
+            yield record
+            last = record
+
+
+def _successors(state, push, counters=None):
+    if push:
+        return push_successors(state, counters)
+    return ((None, child) for child in state.get_successors(counters))
+
+
+def external_bfs(start_state, push=False, directory=None, chunk_size=CHUNK_SIZE, budget=None):
+    """BFS dùng bộ nhớ ngoài: mỗi tầng là một file đã sắp xếp các trạng thái mã hóa.
+
+    Trạng thái con của một tầng được gom thành các run đã sắp xếp (tối đa
+    chunk_size bản ghi trong RAM), trộn lại, bỏ trùng, rồi trừ đi mọi tầng trước
+    (cũng đã sắp xếp) bằng một lượt trộn tuần tự. Các file được đọc qua mmap nên
+    bộ nhớ thường trú không phụ thuộc số trạng thái. Không lưu liên kết cha:
+    đường đi được dựng lại bằng cách quét tầng trước tìm trạng thái sinh ra
+    trạng thái hiện tại. directory: nơi tạo thư mục tạm (mặc định của hệ thống).
+    budget: Budget giới hạn lần tìm (số trạng thái tính cả trên đĩa), hết thì
+    trả về BudgetExceeded.
+    """
+    origin = start_state
+    if push:
+        start_state = normalize(start_state)
+    level = start_state.level
+    width = level.state_bytes
+    folder = tempfile.mkdtemp(prefix="sokoban_bfs_", dir=directory)
+    node_count = 0
+    stored = 1
+    budget = budget or Budget()
+    counters = budget.counters
+
+    def layer_path(depth):
+        return os.path.join(folder, f"layer_{depth}.bin")
+
+    try:
+        with open(layer_path(0), "wb") as f:
+            f.write(start_state.pack())
+        goal = start_state.pack() if start_state.is_goal() else None
+        depth = 0
+        layer_size = 1  # Số trạng thái của tầng đang mở rộng (biên)
+
+        while goal is None:
+            # Mở rộng tầng hiện tại, ghi trạng thái con thành các run đã sắp xếp
+            runs = []
+            buffer = []
+
+            def flush_run():
+                run = os.path.join(folder, f"run_{len(runs)}.bin")
+                with open(run, "wb") as f:
+                    f.writelines(_unique(sorted(buffer)))
+                runs.append(run)
+                buffer.clear()
+
+            for packed in _records(layer_path(depth), width):
+                reason = budget.check(node_count, stored, frontier=layer_size)
+                if reason:
+                    return budget.exceeded(reason, node_count, stored)
+                node_count += 1
+                for _, child in _successors(State.unpack(packed, level), push, counters):
+                    counters.generated += 1
+                    buffer.append(child.pack())
+                    if len(buffer) >= chunk_size:
+                        flush_run()
+            if buffer:
+                flush_run()
+
+            # Trộn các run và loại những trạng thái đã có ở tầng trước
+            depth += 1
+            candidates = _unique(merge(*(_records(run, width) for run in runs)))
+            seen = merge(*(_records(layer_path(d), width) for d in range(depth)))
+            previous = next(seen, None)
+            count = 0
+            with open(layer_path(depth), "wb") as f:
+                for packed in candidates:
+                    while previous is not None and previous < packed:
+                        previous = next(seen, None)
+                    if packed == previous:
+                        counters.duplicates += 1
+                        continue
+                    f.write(packed)
+                    count += 1
+                    if goal is None and State.unpack(packed, level).is_goal():
+                        goal = packed
+            seen.close()
+            for run in runs:
+                os.remove(run)
+            stored += count
+            layer_size = count
+            if count == 0:
+                break
+
+        if goal is None:
+            return budget.finish(None, node_count, stored)
+
+        # Dựng lại đường đi: quét tầng trước tìm trạng thái cha của từng bước
+        target = State.unpack(goal, level)
+        chain = [(target, None)]
+        for d in range(depth - 1, -1, -1):
+            for packed in _records(layer_path(d), width):
+                state = State.unpack(packed, level)
+                move = next((move for move, child in _successors(state, push) if child == target), False)
+                if move is not False:
+                    chain[-1] = (target, move)
+                    chain.append((state, None))
+                    target = state
+                    break
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    chain.reverse()
+    path = [state for state, _ in chain]
+    if push:
+        pushes = [move for _, move in chain[1:]]
+        return budget.finish(reconstruct_push_path(path[-1], path_codes(path, pushes).get, origin), node_count, stored)
+    return budget.finish(reconstruct_path(path[-1], path_codes(path).get), node_count, stored)
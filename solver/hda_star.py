@@ -0,0 +1,253 @@
+import os
+import time
+import zlib
+import queue
+import multiprocessing
+from heapq import heappush, heappop
+from itertools import count
+from State import State
+from LevelContext import LevelContext
+from solver.utils import reconstruct_path, reconstruct_push_path, path_codes
+from solver.push import normalize, push_successors
+from solver.heuristics import BoxMatcher
+from solver.a_star import heuristic, box_toDock
+from solver.budget import Budget
+from solver.events import Counters
+
+# Số trạng thái gom lại trước khi gửi một lô cho tiến trình chủ
+BATCH_SIZE = 256
+# Số nút mở rộng giữa hai lần đọc hộp thư
+EXPAND_STEP = 64
+# Chu kỳ gửi vòng kiểm tra kết thúc (giây)
+PROBE_INTERVAL = 0.02
+
+
+def owner(packed, workers):
+    """Tiến trình sở hữu trạng thái: băm crc32 ổn định giữa các tiến trình"""
+    return zlib.crc32(packed) % workers
+
+
+def _worker(index, map_data, origin, push, inboxes, results):
+    """Một tiến trình HDA*: giữ open/closed của các trạng thái mình sở hữu.
+
+    Thông điệp vào: ("states", lô), ("bound", C), ("probe", vòng),
+    ("parent", packed), ("stop",). Lô gồm (packed, g, h, packed cha, nước đi).
+    Khi dừng gửi về Counters và thời gian CPU của tiến trình.
+    """
+    start_cpu = time.process_time()
+    # Dựng lại LevelContext cùng ô loang gốc để id ô (và mã hóa) khớp tiến trình chủ
+    level = LevelContext(map_data, origin)
+    h = box_toDock if push else heuristic
+    matcher = BoxMatcher(level)
+    workers = len(inboxes)
+    inbox = inboxes[index]
+
+    open_set = []
+    g_score = {}  # packed -> g tốt nhất đã biết
+    parent = {}  # packed -> (packed cha, nước đi)
+    counter = count()
+    bound = float('inf')
+    outgoing = [[] for _ in range(workers)]
+    sent = received = 0
+    node_count = 0
+    counters = Counters()
+
+    def insert(packed, g, h_value, parent_packed, move):
+        if g >= g_score.get(packed, float('inf')):
+            counters.duplicates += 1
+            return
+        if g + h_value >= bound:
+            counters.prune("bound")
+            return
+        g_score[packed] = g
+        parent[packed] = (parent_packed, move)
+        state = State.unpack(packed, level)
+        if state.is_goal():
+            results.put(("solution", g, packed))
+            return
+        heappush(open_set, (g + h_value, -g, next(counter), packed))
+
+    def flush():
+        nonlocal sent
+        for target, batch in enumerate(outgoing):
+            if batch:
+                inboxes[target].put(("states", batch))
+                outgoing[target] = []
+                sent += 1
+
+    def handle(message):
+        nonlocal bound, received
+        kind = message[0]
+        if kind == "states":
+            received += 1
+            for item in message[1]:
+                insert(*item)
+        elif kind == "bound":
+            bound = min(bound, message[1])
+        elif kind == "probe":
+            idle = not open_set or open_set[0][0] >= bound
+            results.put(("status", message[1], index, idle, sent, received, node_count, len(g_score), len(open_set)))
+        elif kind == "parent":
+            results.put(("parent", message[1]) + parent[message[1]])
+        elif kind == "stop":
+            return False
+        return True
+
+    while True:
+        # Còn việc thì chỉ đọc hộp thư không chờ, hết việc thì chờ thông điệp
+        busy = open_set and open_set[0][0] < bound
+        try:
+            message = inbox.get_nowait() if busy else inbox.get()
+            if not handle(message):
+                break
+            continue
+        except queue.Empty:
+            pass
+
+        for _ in range(EXPAND_STEP):
+            if not open_set or open_set[0][0] >= bound:
+                break
+            _, neg_g, _, packed = heappop(open_set)
+            g = -neg_g
+            if g > g_score[packed]:
+                continue  # Mục cũ, đã có đường tốt hơn
+            node_count += 1
+            state = State.unpack(packed, level)
+            if push:
+                successors = push_successors(state, counters)
+            else:
+                successors = ((None, child) for child in state.get_successors(counters))
+            for move, child in successors:
+                counters.generated += 1
+                child_packed = child.pack()
+                item = (child_packed, g + 1, h(child, matcher, state), packed, move)
+                target = owner(child_packed, workers)
+                if target == index:
+                    insert(*item)
+                else:
+                    outgoing[target].append(item)
+                    if len(outgoing[target]) >= BATCH_SIZE:
+                        inboxes[target].put(("states", outgoing[target]))
+                        outgoing[target] = []
+                        sent += 1
+        flush()
+
+    results.put(("done", index, node_count, len(g_score), counters, time.process_time() - start_cpu))
+
+
+def hda_star(start_state, push=False, workers=None, budget=None):
+    """Hash-distributed A* (HDA*) trên nhiều tiến trình.
+
+    Mỗi trạng thái thuộc về tiến trình owner(pack()); tiến trình nào sinh ra
+    trạng thái thì gửi theo lô cho chủ của nó. Khi có lời giải chi phí C, cận C
+    được phát cho mọi tiến trình. Kết thúc khi hai vòng kiểm tra liên tiếp thấy
+    mọi tiến trình rảnh (open rỗng hoặc f nhỏ nhất >= C) và tổng số lô đã gửi
+    bằng tổng số lô đã nhận, không đổi giữa hai vòng: khi đó không còn nút nào
+    có f < C nên C là tối ưu (heuristic chấp nhận được).
+    Trả về (path, directions) như a_star, hoặc None. budget: Budget kiểm tra ở
+    tiến trình điều phối (số nút/trạng thái cập nhật mỗi vòng kiểm tra), hết thì
+    dừng mọi tiến trình và trả về BudgetExceeded.
+    """
+    workers = workers or os.cpu_count() or 1
+    origin = start_state
+    level = start_state.level
+    if push:
+        start_state = normalize(start_state)
+    inboxes = [multiprocessing.Queue() for _ in range(workers)]
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_worker, args=(k, level.map_data, level.cells[0], push, inboxes, results), daemon=True)
+        for k in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    h = box_toDock if push else heuristic
+    start_packed = start_state.pack()
+    inboxes[owner(start_packed, workers)].put(("states", [(start_packed, 0, h(start_state), None, None)]))
+    initial_sent = 1
+
+    best_cost = float('inf')
+    best_packed = None
+    probe_round = 0
+    replies = {}
+    previous = None  # (tổng gửi, tổng nhận) của vòng trước nếu mọi tiến trình rảnh
+    last_probe = 0
+    budget = budget or Budget()
+    reason = None
+    progress = (0, 0)  # (số nút, số trạng thái) theo vòng kiểm tra gần nhất
+    frontier = 1  # Tổng kích thước open của các tiến trình (có thể gồm mục cũ)
+    while True:
+        reason = budget.check(*progress, interval=1, frontier=frontier)
+        if reason:
+            break
+        if not replies and time.perf_counter() - last_probe >= PROBE_INTERVAL:
+            probe_round += 1
+            last_probe = time.perf_counter()
+            for inbox in inboxes:
+                inbox.put(("probe", probe_round))
+        try:
+            message = results.get(timeout=PROBE_INTERVAL)
+        except queue.Empty:
+            continue
+        if message[0] == "solution":
+            _, g, packed = message
+            if g < best_cost:
+                best_cost, best_packed = g, packed
+                previous = None
+                for inbox in inboxes:
+                    inbox.put(("bound", g))
+        elif message[0] == "status" and message[1] == probe_round:
+            _, _, index, idle, sent, received, nodes, states, open_size = message
+            replies[index] = (idle, sent, received, nodes, states, open_size)
+            if len(replies) < workers:
+                continue
+            progress = (sum(r[3] for r in replies.values()), sum(r[4] for r in replies.values()))
+            frontier = sum(r[5] for r in replies.values())
+            all_idle = all(reply[0] for reply in replies.values())
+            totals = (initial_sent + sum(r[1] for r in replies.values()), sum(r[2] for r in replies.values()))
+            replies = {}
+            if all_idle and totals[0] == totals[1]:
+                if previous == totals:
+                    break
+                previous = totals
+            else:
+                previous = None
+
+    # Truy vết qua chủ của từng trạng thái trên đường đi
+    chain = []
+    packed = best_packed if not reason else None
+    while packed is not None:
+        inboxes[owner(packed, workers)].put(("parent", packed))
+        while True:
+            message = results.get()
+            if message[0] == "parent" and message[1] == packed:
+                break
+        chain.append((packed, message[3]))
+        packed = message[2]
+
+    for inbox in inboxes:
+        inbox.put(("stop",))
+    node_count = states = 0
+    finished = 0
+    while finished < workers:
+        message = results.get()
+        if message[0] == "done":
+            finished += 1
+            node_count += message[2]
+            states += message[3]
+            budget.add_worker(message[4], message[5])
+    for process in processes:
+        process.join()
+
+    if reason:
+        return budget.exceeded(reason, node_count, states)
+    if best_packed is None:
+        return budget.finish(None, node_count, states)
+
+    chain.reverse()
+    path = [State.unpack(packed, level) for packed, _ in chain]
+    if push:
+        pushes = [move for _, move in chain[1:]]
+        return budget.finish(reconstruct_push_path(path[-1], path_codes(path, pushes).get, origin), node_count, states)
+    return budget.finish(reconstruct_path(path[-1], path_codes(path).get), node_count, states)
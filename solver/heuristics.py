@@ -0,0 +1,141 @@
+from collections import OrderedDict
+from LevelContext import LevelContext, UNREACHABLE
+
+# Chi phí cho cặp hộp - đích không thể ghép (đủ lớn để không bao giờ là tối ưu)
+INF = 10 ** 6
+# Số cấu hình hộp giữ lại trong cache ghép cặp (LRU)
+CACHE_SIZE = 4096
+
+
+class Matching:
+    """Lời giải bài toán ghép cặp hộp - đích (Hungarian) kèm thế vị đối ngẫu.
+
+    Ma trận vuông cỡ số đích: hàng 1..n là hộp (thêm hộp giả chi phí 0 nếu ít
+    hộp hơn đích), cột 1..n là đích. Giữ lại u, v, p để cập nhật tăng dần khi
+    chỉ một hộp di chuyển.
+    """
+    __slots__ = ('rows', 'u', 'v', 'p', 'cost')
+
+    def __init__(self, rows, u, v, p, cost):
+        self.rows = rows  # rows[i - 1]: id ô của hộp ở hàng i, -1 là hộp giả
+        self.u = u
+        self.v = v
+        self.p = p  # p[j]: hàng được ghép với cột j
+        self.cost = cost
+
+
+class BoxMatcher:
+    """Cận dưới số lần đẩy: ghép cặp hộp - đích có tổng khoảng cách nhỏ nhất.
+
+    Lời giải ghép cặp được lưu theo bitmask hộp trong một cache LRU cỡ
+    cache_size (chỉ cần giữ các trạng thái vừa mở rộng). Khi biết trạng thái
+    cha, chỉ hàng của hộp vừa đẩy được gỡ ra và ghép lại bằng một lần tìm
+    đường tăng (O(n^2)) thay vì giải lại từ đầu.
+    """
+
+    def __init__(self, level, cache_size=CACHE_SIZE):
+        self.level = level
+        self.n = len(level.goals)
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+
+    def _cost(self, cell, j):
+        if cell < 0:
+            return 0
+        d = self.level.distances[cell * self.n + j - 1]
+        return d if d != UNREACHABLE else INF
+
+    def _augment(self, rows, u, v, p, i):
+        """Thêm hàng i vào cặp ghép (thuật toán Hungarian dạng thế vị)"""
+        n = self.n
+        minv = [float('inf')] * (n + 1)
+        used = [False] * (n + 1)
+        way = [0] * (n + 1)
+        p[0] = i
+        j0 = 0
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            cell = rows[i0 - 1]
+            delta = float('inf')
+            j1 = 0
+            for j in range(1, n + 1):
+                if not used[j]:
+                    cur = self._cost(cell, j) - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(n + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    def _total(self, rows, p):
+        return sum(self._cost(rows[p[j] - 1], j) for j in range(1, self.n + 1))
+
+    def solve(self, boxes):
+        """Giải ghép cặp từ đầu cho một cấu hình hộp"""
+        n = self.n
+        rows = list(LevelContext.iter_cells(boxes))
+        rows += [-1] * (n - len(rows))
+        u = [0] * (n + 1)
+        v = [0] * (n + 1)
+        p = [0] * (n + 1)
+        for i in range(1, n + 1):
+            self._augment(rows, u, v, p, i)
+        return Matching(rows, u, v, p, self._total(rows, p))
+
+    def update(self, matching, old_cell, new_cell):
+        """Ghép lại khi một hộp đi từ old_cell sang new_cell"""
+        rows = list(matching.rows)
+        u = list(matching.u)
+        v = list(matching.v)
+        p = list(matching.p)
+        i = rows.index(old_cell) + 1
+        rows[i - 1] = new_cell
+        # Gỡ hàng i khỏi cặp ghép và hạ thế vị để mọi chi phí rút gọn vẫn >= 0
+        p[p.index(i, 1)] = 0
+        u[i] = min(self._cost(new_cell, j) - v[j] for j in range(1, self.n + 1))
+        self._augment(rows, u, v, p, i)
+        return Matching(rows, u, v, p, self._total(rows, p))
+
+    def matching(self, state, parent=None):
+        cache = self.cache
+        boxes = state.boxes
+        result = cache.get(boxes)
+        if result is not None:
+            cache.move_to_end(boxes)
+            return result
+        moved = boxes ^ parent.boxes if parent is not None else 0
+        if moved and bin(moved).count("1") == 2:
+            # Cha bị đẩy khỏi cache thì giải lại cha một lần, các con dùng chung
+            previous = self.matching(parent)
+            old_cell = (moved & parent.boxes).bit_length() - 1
+            new_cell = (moved & boxes).bit_length() - 1
+            result = self.update(previous, old_cell, new_cell)
+        else:
+            result = self.solve(boxes)
+        cache[boxes] = result
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return result
+
+    def cost(self, state, parent=None):
+        """Cận dưới số lần đẩy, float('inf') nếu không thể ghép đủ hộp vào đích"""
+        # Nhiều hộp hơn đích tới được (đích trong hốc kín bị LevelContext bỏ)
+        if bin(state.boxes).count("1") > self.n:
+            return float('inf')
+        total = self.matching(state, parent).cost
+        return total if total < INF else float('inf')
@@ -0,0 +1,153 @@
+from solver.utils import reconstruct_path, reconstruct_push_path, path_codes
+from solver.push import normalize, push_successors
+from solver.heuristics import BoxMatcher
+from solver.a_star import heuristic, box_toDock
+from solver.budget import Budget
+from solver.table import StateTable
+
+# Số mục tối đa mặc định của bảng chuyển vị
+DEFAULT_TABLE_SIZE = 1 << 17
+
+
+class TranspositionTable:
+    """Bảng chuyển vị có giới hạn số mục.
+
+    Lưu g nhỏ nhất đã mở rộng mỗi trạng thái trong vòng lặp hiện tại. Khi đầy,
+    bỏ trước các mục của vòng lặp cũ (tuổi), sau đó bỏ các mục sâu nhất cho
+    tới khi còn một nửa sức chứa. level: dùng StateTable (compact) thay dict;
+    bảng này không xóa được từng mục nên mỗi vòng lặp mới, hoặc khi đầy, bắt
+    đầu một bảng trống.
+    """
+
+    def __init__(self, capacity=DEFAULT_TABLE_SIZE, level=None):
+        self.capacity = capacity
+        self.level = level
+        self.entries = StateTable(level) if level is not None else {}  # state -> (vòng lặp, g) hoặc g
+        self.iteration = 0  # Vòng lặp của các mục trong StateTable
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _evict(self, iteration):
+        entries = self.entries
+        before = len(entries)
+        stale = [key for key, (it, _) in entries.items() if it != iteration]
+        for key in stale:
+            del entries[key]
+        if len(entries) > self.capacity // 2:
+            by_depth = sorted(entries.items(), key=lambda item: item[1][1])
+            self.entries = entries = dict(by_depth[:self.capacity // 2])
+        self.evictions += before - len(entries)
+
+    def _reset(self):
+        self.evictions += len(self.entries)
+        self.entries = StateTable(self.level, len(self.entries))
+
+    def seen(self, state, g, iteration):
+        """True nếu state đã được mở rộng với g không lớn hơn trong vòng này"""
+        if self.level is not None:
+            if iteration != self.iteration:
+                self.iteration = iteration
+                self._reset()
+            best = self.entries.get(state)
+            if best is not None and best <= g:
+                return True
+            if best is None and len(self.entries) >= self.capacity:
+                self._reset()
+            self.entries[state] = g
+            return False
+        entry = self.entries.get(state)
+        if entry is not None and entry[0] == iteration and entry[1] <= g:
+            return True
+        if entry is None and len(self.entries) >= self.capacity:
+            self._evict(iteration)
+        self.entries[state] = (iteration, g)
+        return False
+
+
+def ida_star(start_state, push=False, table_size=DEFAULT_TABLE_SIZE, compact=False, budget=None):
+    """IDA*: lặp sâu dần theo ngưỡng f, bộ nhớ giới hạn bởi table_size mục.
+
+    push=True: tìm theo số lần đẩy hộp như a_star(push=True). compact=True:
+    bảng chuyển vị dùng StateTable thay cho dict. budget: Budget giới hạn lần
+    tìm, hết thì trả về BudgetExceeded.
+    """
+    origin = start_state
+    h = heuristic
+    if push:
+        start_state = normalize(start_state)
+        h = box_toDock
+    matcher = BoxMatcher(start_state.level)
+    table = TranspositionTable(table_size, start_state.level if compact else None)
+    node_count = 0
+    iteration = 0
+    budget = budget or Budget()
+    counters = budget.counters
+
+    def expand(state):
+        if push:
+            successors = push_successors(state, counters)
+        else:
+            successors = [(None, child) for child in state.get_successors(counters)]
+        children = []
+        for move, child in successors:
+            counters.generated += 1
+            children.append((h(child, matcher, state), move, child))
+        # Thử con có heuristic nhỏ trước
+        children.sort(key=lambda item: item[0])
+        return iter(children)
+
+    def finish(path, moves):
+        if push:
+            result = reconstruct_push_path(path[-1], path_codes(path, moves[1:]).get, origin)
+        else:
+            result = reconstruct_path(path[-1], path_codes(path).get)
+        return budget.finish(result, node_count, len(table))
+
+    if start_state.is_goal():
+        return finish([start_state], [None])
+
+    bound = h(start_state, matcher)
+    while bound < float('inf'):
+        iteration += 1
+        next_bound = float('inf')
+        path = [start_state]
+        moves = [None]
+        on_path = {start_state}
+        stack = [expand(start_state)]
+
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                on_path.discard(path.pop())
+                moves.pop()
+                continue
+            h_child, move, child = item
+            if child in on_path:
+                counters.prune("cycle")
+                continue
+            g = len(path)
+            f = g + h_child
+            if f > bound:
+                next_bound = min(next_bound, f)
+                counters.prune("bound")
+                continue
+            if table.seen(child, g, iteration):
+                counters.duplicates += 1
+                continue
+            reason = budget.check(node_count, len(table), frontier=len(path), best_f=bound)
+            if reason:
+                return budget.exceeded(reason, node_count, len(table))
+            node_count += 1
+            path.append(child)
+            moves.append(move)
+            on_path.add(child)
+            if child.is_goal():
+                return finish(path, moves)
+            stack.append(expand(child))
+
+        bound = next_bound
+
+    return budget.finish(None, node_count, len(table))
@@ -0,0 +1,91 @@
+import os
+import sys
+import tracemalloc
+
+# Chế độ đo: không đo bộ nhớ, ước lượng theo kích thước cấu trúc, lấy mẫu RSS,
+# hoặc tracemalloc đầy đủ (chậm nhiều lần, chỉ dùng để gỡ lỗi)
+OFF = "off"
+COUNTERS = "counters"
+SAMPLED = "sampled"
+TRACE = "tracemalloc"
+MODES = (OFF, COUNTERS, SAMPLED, TRACE)
+
+# Chi phí một mục dict/set (khóa, giá trị, băm, chỉ mục) tính cả chỗ trống theo hệ số tải
+DICT_ENTRY = 40
+# Một con trỏ trong deque/list
+POINTER = 8
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def entry_bytes(state, tables=1, compact=False):
+    """Ước lượng số byte cho mỗi trạng thái lưu trong bảng visited/g_score.
+
+    tables: số dict/set (hoặc StateTable khi compact) dùng trạng thái làm khóa.
+    StateTable: khóa đóng gói, g, mã nước đi, tính cả chỗ trống.
+    """
+    if compact:
+        return (state.level.state_bytes + 6) * 2 * tables
+    return sys.getsizeof(state) + sys.getsizeof(state.boxes) + DICT_ENTRY * tables
+
+
+def _rss():
+    """Bộ nhớ thường trú hiện tại của tiến trình (byte), None nếu không đọc được"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Instrument:
+    """Đo bộ nhớ cho một lần giải theo mode (OFF, COUNTERS, SAMPLED, TRACE).
+
+    COUNTERS: số trạng thái * entry_bytes + biên * frontier_bytes, cập nhật ở
+    mỗi lần Budget đọc đồng hồ nên gần như không tốn gì. SAMPLED: đọc RSS của
+    tiến trình ở các lần đó (ước lượng nếu không đọc được). TRACE: tracemalloc.
+    Solver gọi start() trước vòng lặp và stop() ở mọi lối ra.
+    """
+
+    def __init__(self, mode=COUNTERS):
+        if mode not in MODES:
+            raise ValueError(f"Chế độ đo không hợp lệ: {mode!r}")
+        self.mode = mode
+        self.entry_bytes = 0
+        self.frontier_bytes = POINTER
+        self.baseline = None
+        self.current = 0
+        self.peak = 0
+
+    def start(self, entry_bytes=0, frontier_bytes=POINTER):
+        self.entry_bytes = entry_bytes
+        self.frontier_bytes = frontier_bytes
+        self.current = 0
+        self.peak = 0
+        if self.mode == TRACE:
+            tracemalloc.start()
+        elif self.mode == SAMPLED:
+            self.baseline = _rss()
+
+    def sample(self, states, frontier=None):
+        """Cập nhật bộ nhớ hiện tại và đỉnh (Budget gọi mỗi lần đọc đồng hồ)"""
+        if self.mode == OFF or self.mode == TRACE:
+            return
+        rss = _rss() if self.mode == SAMPLED and self.baseline is not None else None
+        if rss is not None:
+            self.current = max(0, rss - self.baseline)
+        else:
+            self.current = states * self.entry_bytes + (frontier or 0) * self.frontier_bytes
+        if self.current > self.peak:
+            self.peak = self.current
+
+    def stop(self, states=0, frontier=None):
+        """Kết thúc đo, trả về (hiện tại, đỉnh) theo byte, hoặc None khi OFF"""
+        if self.mode == OFF:
+            return None
+        if self.mode == TRACE:
+            if tracemalloc.is_tracing():
+                self.current, self.peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+        else:
+            self.sample(states, frontier)
+        return self.current, self.peak
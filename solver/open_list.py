@@ -0,0 +1,182 @@
+class IndexedHeap:
+    """Min-heap nhị phân có chỉ mục item -> vị trí cho open set của A*.
+
+    Hỗ trợ kiểm tra `in` O(1) và đổi khóa (decrease-key) O(log n) thay cho việc
+    đẩy bản sao vào heap. Mỗi mục là list [key, thứ tự chèn, item, vị trí]: so
+    sánh list dừng ở thứ tự chèn (duy nhất) nên hai mục cùng khóa ra theo thứ
+    tự vào và item không bao giờ bị so sánh; vị trí nằm trong mục nên khi vun
+    heap không phải băm lại item.
+    """
+    # Ước lượng byte mỗi mục: list 4 phần tử, con trỏ trong heap, mục index
+    entry_bytes = 136
+
+    def __init__(self):
+        self.heap = []
+        self.index = {}  # item -> mục
+        self.counter = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.index
+
+    def key(self, item):
+        return self.index[item][0]
+
+    def min_key(self):
+        return self.heap[0][0]
+
+    def push(self, item, key):
+        """Thêm item, hoặc đổi khóa nếu item đã có trong heap"""
+        entry = self.index.get(item)
+        if entry is not None:
+            old = entry[0]
+            entry[0] = key
+            if key < old:
+                self._sift_up(entry[3])
+            elif key > old:
+                self._sift_down(entry[3])
+            return
+        entry = [key, self.counter, item, len(self.heap)]
+        self.counter += 1
+        self.index[item] = entry
+        self.heap.append(entry)
+        self._sift_up(entry[3])
+
+    def pop(self):
+        """Lấy item có khóa nhỏ nhất"""
+        heap = self.heap
+        top = heap[0]
+        last = heap.pop()
+        if heap:
+            # Như heapq: đưa con nhỏ hơn lên tới lá rồi mới chèn mục cuối vào,
+            # mỗi tầng chỉ một phép so sánh
+            size = len(heap)
+            pos = 0
+            child = 1
+            while child < size:
+                if child + 1 < size and heap[child + 1] < heap[child]:
+                    child += 1
+                below = heap[child]
+                heap[pos] = below
+                below[3] = pos
+                pos = child
+                child = 2 * pos + 1
+            heap[pos] = last
+            last[3] = pos
+            self._sift_up(pos)
+        del self.index[top[2]]
+        return top[2]
+
+    def _sift_up(self, pos):
+        heap = self.heap
+        entry = heap[pos]
+        while pos > 0:
+            parent = (pos - 1) >> 1
+            above = heap[parent]
+            if entry < above:
+                heap[pos] = above
+                above[3] = pos
+                pos = parent
+            else:
+                break
+        heap[pos] = entry
+        entry[3] = pos
+
+    def _sift_down(self, pos):
+        heap = self.heap
+        size = len(heap)
+        entry = heap[pos]
+        while True:
+            child = 2 * pos + 1
+            if child >= size:
+                break
+            below = heap[child]
+            if child + 1 < size and heap[child + 1] < below:
+                child += 1
+                below = heap[child]
+            if below < entry:
+                heap[pos] = below
+                below[3] = pos
+                pos = child
+            else:
+                break
+        heap[pos] = entry
+        entry[3] = pos
+
+
+class BucketQueue:
+    """Open set dạng mảng bucket theo f nguyên (chi phí đơn vị, heuristic nguyên).
+
+    buckets[f][h] là list LIFO; lowest_h=True lấy trong cùng f mục có h nhỏ nhất
+    (gần đích nhất) trước, lowest_h=False chỉ LIFO. Thêm và lấy O(1) (trừ lúc
+    dò tới bucket khác rỗng), không tạo tuple và không so sánh item. Đổi khóa
+    kiểu lười: mục cũ ở lại bucket và bị bỏ qua khi lấy ra vì index giữ f mới.
+    """
+    # Ước lượng byte mỗi mục: con trỏ trong bucket, mục index
+    entry_bytes = 48
+
+    def __init__(self, lowest_h=True):
+        self.lowest_h = lowest_h
+        self.buckets = []  # f -> list các list theo h
+        self.counts = []  # f -> số mục trong bucket (kể cả mục cũ)
+        self.low = []  # f -> h nhỏ nhất có thể còn mục
+        self.index = {}  # item -> f hiện hành
+        self.min_f = 0
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, item):
+        return item in self.index
+
+    def key(self, item):
+        return self.index[item]
+
+    def min_key(self):
+        counts = self.counts
+        while self.min_f < len(counts) and counts[self.min_f] == 0:
+            self.min_f += 1
+        return self.min_f
+
+    def push(self, item, f, h=0):
+        """Thêm item với f (số nguyên không âm), hoặc đổi f nếu đã có"""
+        if self.index.get(item) == f:
+            return
+        self.index[item] = f
+        if not self.lowest_h:
+            h = 0
+        buckets = self.buckets
+        if f >= len(buckets):
+            grow = f + 1 - len(buckets)
+            buckets.extend([] for _ in range(grow))
+            self.counts.extend([0] * grow)
+            self.low.extend([0] * grow)
+        bucket = buckets[f]
+        if h >= len(bucket):
+            bucket.extend([] for _ in range(h + 1 - len(bucket)))
+        bucket[h].append(item)
+        self.counts[f] += 1
+        if h < self.low[f]:
+            self.low[f] = h
+        if f < self.min_f:
+            self.min_f = f
+
+    def pop(self):
+        """Lấy item có f nhỏ nhất (rồi h nhỏ nhất), mục vào sau ra trước"""
+        index = self.index
+        counts = self.counts
+        low = self.low
+        while True:
+            f = self.min_key()
+            bucket = self.buckets[f]
+            h = low[f]
+            while not bucket[h]:
+                h += 1
+            low[f] = h
+            item = bucket[h].pop()
+            counts[f] -= 1
+            if index.get(item) == f:
+                del index[item]
+                return item
@@ -0,0 +1,243 @@
+import os
+import time
+import queue
+import multiprocessing
+from array import array
+from State import State
+from LevelContext import LevelContext
+from solver.utils import reconstruct_path, reconstruct_push_path, path_codes
+from solver.push import normalize, push_successors
+from solver.hda_star import owner
+from solver.budget import Budget
+from solver.events import Counters
+
+# Liên kết cha rỗng (trạng thái đầu)
+NO_PARENT = 0xFFFFFFFF
+# Tỷ lệ lấp đầy tối đa của bảng băm visited trước khi nhân đôi
+MAX_LOAD = 0.7
+# Số nút mở rộng giữa hai lần xem cờ hủy trong một tầng
+CANCEL_CHECK = 256
+# Chu kỳ kiểm tra budget của tiến trình điều phối khi chờ một tầng (giây)
+POLL_INTERVAL = 0.05
+
+
+def _worker(index, map_data, origin, push, inboxes, results, cancel):
+    """Một mảnh của BFS song song: giữ visited và liên kết cha của các trạng thái mình sở hữu.
+
+    Trạng thái lưu nối tiếp trong một bytearray (mỗi trạng thái state_bytes
+    byte); visited là bảng băm địa chỉ mở (dò tuyến tính) chỉ chứa id cục bộ
+    trỏ vào bytearray đó. Liên kết cha là số nguyên id cục bộ * workers +
+    mảnh, kèm một số nguyên nước đi (ô hộp * 4 + hướng khi đẩy). cancel được
+    đặt thì tầng đang mở rộng dừng sớm. Khi dừng gửi về Counters và thời gian
+    CPU của tiến trình.
+    """
+    start_cpu = time.process_time()
+    level = LevelContext(map_data, origin)
+    width = level.state_bytes
+    workers = len(inboxes)
+    inbox = inboxes[index]
+
+    states = bytearray()  # Các trạng thái đã gặp, theo thứ tự id cục bộ
+    slots = array('I', [0]) * 1024  # id cục bộ + 1 của mỗi ô bảng băm, 0 là ô trống
+    parents = array('I')
+    moves = array('I')
+    frontier = []  # id cục bộ của tầng hiện tại
+    node_count = 0
+    counters = Counters()
+
+    def find(packed):
+        """Ô bảng băm chứa packed, hoặc ô trống đầu tiên trên dãy dò"""
+        mask = len(slots) - 1
+        slot = hash(packed) & mask
+        while True:
+            ref = slots[slot]
+            if not ref:
+                return slot
+            offset = (ref - 1) * width
+            if states[offset:offset + width] == packed:
+                return slot
+            slot = (slot + 1) & mask
+
+    def grow():
+        nonlocal slots
+        slots = array('I', [0]) * (len(slots) * 2)
+        for local in range(len(parents)):
+            slots[find(bytes(states[local * width:(local + 1) * width]))] = local + 1
+
+    def add(slot, packed, parent, move):
+        local = len(parents)
+        slots[slot] = local + 1
+        states.extend(packed)
+        parents.append(parent)
+        moves.append(move)
+        if len(parents) > len(slots) * MAX_LOAD:
+            grow()
+        return local
+
+    def expand():
+        """Mở rộng trọn tầng, gom trạng thái con theo mảnh sở hữu"""
+        nonlocal node_count
+        blobs = [bytearray() for _ in range(workers)]
+        links = [array('I') for _ in range(workers)]
+        for k, local in enumerate(frontier):
+            # Bị hủy giữa tầng: vẫn gửi các lô đã gom để mọi mảnh kết thúc tầng
+            if k % CANCEL_CHECK == 0 and cancel.is_set():
+                break
+            node_count += 1
+            packed = bytes(states[local * width:(local + 1) * width])
+            state = State.unpack(packed, level)
+            if push:
+                successors = push_successors(state, counters)
+            else:
+                successors = ((None, child) for child in state.get_successors(counters))
+            ref = local * workers + index
+            for move, child in successors:
+                counters.generated += 1
+                child_packed = child.pack()
+                target = owner(child_packed, workers)
+                blobs[target].extend(child_packed)
+                links[target].append(ref)
+                links[target].append(move[0] * 4 + move[1] if move else 0)
+        for target in range(workers):
+            inboxes[target].put(("candidates", bytes(blobs[target]), links[target].tobytes()))
+
+    while True:
+        message = inbox.get()
+        kind = message[0]
+        if kind == "seed":
+            frontier = [add(find(message[1]), message[1], NO_PARENT, 0)]
+        elif kind == "expand":
+            expand()
+        elif kind == "candidates":
+            # Mỗi mảnh nhận đúng một lô từ mọi mảnh trong một tầng
+            # (có thể nhận lô của mảnh khác trước lệnh mở rộng của chính mình)
+            batches = [message]
+            while len(batches) < workers:
+                message = inbox.get()
+                if message[0] == "expand":
+                    expand()
+                else:
+                    batches.append(message)
+            frontier = []
+            goal = None
+            for _, blob, raw_links in batches:
+                link = array('I')
+                link.frombytes(raw_links)
+                for k in range(len(blob) // width):
+                    packed = blob[k * width:(k + 1) * width]
+                    slot = find(packed)
+                    if slots[slot]:
+                        counters.duplicates += 1
+                        continue
+                    local = add(slot, packed, link[2 * k], link[2 * k + 1])
+                    frontier.append(local)
+                    if goal is None and State.unpack(packed, level).is_goal():
+                        goal = local * workers + index
+            results.put(("layer", index, len(frontier), goal, node_count, len(parents)))
+        elif kind == "parent":
+            local = message[1] // workers
+            packed = bytes(states[local * width:(local + 1) * width])
+            results.put(("parent", message[1], packed, parents[local], moves[local]))
+        elif kind == "stop":
+            results.put(("done", index, node_count, len(parents), counters, time.process_time() - start_cpu))
+            return
+
+
+def parallel_bfs(start_state, push=False, workers=None, budget=None):
+    """BFS đồng bộ theo tầng trên nhiều tiến trình.
+
+    Visited được chia mảnh theo băm của trạng thái đã mã hóa; mỗi tầng, mọi
+    mảnh mở rộng phần biên của mình rồi gửi trạng thái con (bytes, không phải
+    State) cho mảnh sở hữu để lọc trùng. Đường đi dựng lại qua liên kết cha gọn.
+    Trả về (path, directions) như bfs, hoặc None. budget: Budget kiểm tra giữa
+    các tầng và định kỳ trong lúc chờ một tầng (hết thì các mảnh dừng tầng
+    đang mở rộng), trả về BudgetExceeded.
+    """
+    workers = workers or os.cpu_count() or 1
+    origin = start_state
+    level = start_state.level
+    if push:
+        start_state = normalize(start_state)
+
+    inboxes = [multiprocessing.Queue() for _ in range(workers)]
+    results = multiprocessing.Queue()
+    cancel = multiprocessing.Event()
+    processes = [
+        multiprocessing.Process(target=_worker, args=(k, level.map_data, level.cells[0], push, inboxes, results, cancel),
+                                daemon=True)
+        for k in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    start_packed = start_state.pack()
+    start_owner = owner(start_packed, workers)
+    inboxes[start_owner].put(("seed", start_packed))
+
+    goal = None
+    budget = budget or Budget()
+    reason = None
+    progress = (0, 1)
+    frontier_size = 1
+    if start_state.is_goal():
+        goal = start_owner
+    while goal is None:
+        reason = budget.check(*progress, interval=1, frontier=frontier_size)
+        if reason:
+            break
+        for inbox in inboxes:
+            inbox.put(("expand",))
+        size_total = nodes = states = 0
+        replies = 0
+        while replies < workers:
+            try:
+                _, _, size, found, expanded, visited = results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                # Tầng rộng: vẫn theo dõi thời gian và lệnh hủy trong lúc chờ
+                if not reason:
+                    reason = budget.check(*progress, interval=1, frontier=frontier_size)
+                    if reason:
+                        cancel.set()
+                continue
+            replies += 1
+            size_total += size
+            nodes += expanded
+            states += visited
+            if found is not None and goal is None:
+                goal = found
+        progress = (nodes, states)
+        frontier_size = size_total
+        if reason or frontier_size == 0:
+            break
+
+    # Truy vết liên kết cha qua các mảnh
+    chain = []
+    ref = goal if not reason else None
+    while ref is not None and ref != NO_PARENT:
+        inboxes[ref % workers].put(("parent", ref))
+        _, _, packed, parent, move = results.get()
+        chain.append((State.unpack(packed, level), divmod(move, 4)))
+        ref = parent
+
+    for inbox in inboxes:
+        inbox.put(("stop",))
+    node_count = stored = 0
+    for _ in range(workers):
+        _, _, expanded, visited, counters, cpu_time = results.get()
+        node_count += expanded
+        stored += visited
+        budget.add_worker(counters, cpu_time)
+    for process in processes:
+        process.join()
+
+    if reason:
+        return budget.exceeded(reason, node_count, stored)
+    if goal is None:
+        return budget.finish(None, node_count, stored)
+
+    chain.reverse()
+    path = [state for state, _ in chain]
+    if push:
+        pushes = [move for _, move in chain[1:]]
+        return budget.finish(reconstruct_push_path(path[-1], path_codes(path, pushes).get, origin), node_count, stored)
+    return budget.finish(reconstruct_path(path[-1], path_codes(path).get), node_count, stored)
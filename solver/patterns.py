@@ -0,0 +1,264 @@
+import os
+import time
+from weakref import WeakKeyDictionary
+
+# Cửa sổ SIZE x SIZE quanh hộp vừa đẩy
+SIZE = 5
+RADIUS = SIZE // 2
+# Giới hạn số nút khi chứng minh một cửa sổ là deadlock
+PROOF_LIMIT = 200
+# Số cửa sổ chứng minh hụt được nhớ cho mỗi màn, đầy thì xóa
+CHECKED_LIMIT = 10000
+# File khóa khi ghi: chờ tối đa LOCK_WAIT giây, khóa cũ hơn LOCK_STALE giây coi như bị bỏ lại
+LOCK_WAIT = 1.0
+LOCK_STALE = 10.0
+
+# Mã hóa ô: tường, hộp, hộp trên đích, đích, sàn; đích/sàn người chơi chưa tới được
+WALL, BOX, BOX_GOAL, GOAL, FLOOR = "#", "$", "*", ".", "-"
+CLOSED_GOAL, CLOSED_FLOOR = ",", "_"
+
+
+def _transforms(pattern):
+    """8 phép quay/lật của một cửa sổ (chuỗi SIZE*SIZE ký tự)"""
+    grid = [pattern[i * SIZE:(i + 1) * SIZE] for i in range(SIZE)]
+    result = []
+    for _ in range(4):
+        grid = ["".join(grid[SIZE - 1 - j][i] for j in range(SIZE)) for i in range(SIZE)]
+        result.append("".join(grid))
+        result.append("".join(row[::-1] for row in grid))
+    return result
+
+
+# Lưới chứng minh: cửa sổ bao bởi một vòng sàn tự do
+WIDTH = SIZE + 2
+OFFSETS = (-WIDTH, WIDTH, -1, 1)
+RING_MASK = sum(
+    1 << c for c in range(WIDTH * WIDTH)
+    if c // WIDTH in (0, WIDTH - 1) or c % WIDTH in (0, WIDTH - 1)
+)
+GRID_NEIGHBORS = [
+    tuple(c + d for d, ok in zip(OFFSETS, (c >= WIDTH, c < WIDTH * (WIDTH - 1), c % WIDTH > 0, c % WIDTH < WIDTH - 1)) if ok)
+    for c in range(WIDTH * WIDTH)
+]
+
+
+def _region(start, blocked):
+    region = 1 << start
+    stack = [start]
+    while stack:
+        c = stack.pop()
+        for n in GRID_NEIGHBORS[c]:
+            if not (region | blocked) >> n & 1:
+                region |= 1 << n
+                stack.append(n)
+    return region
+
+
+def prove_deadlock(pattern, limit=PROOF_LIMIT):
+    """Chứng minh cửa sổ là deadlock bất kể phần còn lại của màn.
+
+    Cửa sổ được bao bởi một vòng sàn tự do: hộp đẩy ra vòng này coi như thoát
+    và bị bỏ đi, người chơi có thể vào từ vòng ngoài hoặc đứng ở ô đánh dấu tới
+    được. Đây là bài toán nới lỏng, nên nếu vẫn không thể đưa mọi hộp còn lại
+    vào đích thì cửa sổ là deadlock ở mọi màn chứa nó. Hết giới hạn nút thì trả
+    về False.
+    """
+    walls = goals = boxes = 0
+    open_cells = RING_MASK
+    for k, ch in enumerate(pattern):
+        bit = 1 << ((k // SIZE + 1) * WIDTH + k % SIZE + 1)
+        if ch == WALL:
+            walls |= bit
+        if ch in (BOX, BOX_GOAL):
+            boxes |= bit
+        if ch in (GOAL, BOX_GOAL, CLOSED_GOAL):
+            goals |= bit
+        if ch in (GOAL, FLOOR):
+            open_cells |= bit
+
+    # Các vùng người chơi có thể xuất phát
+    stack = []
+    visited = set()
+    covered = walls | boxes
+    for c in range(WIDTH * WIDTH):
+        if covered >> c & 1 or not open_cells >> c & 1:
+            continue
+        region = _region(c, walls | boxes)
+        covered |= region
+        visited.add(((region & -region).bit_length(), boxes))
+        stack.append((region, boxes))
+
+    while stack:
+        region, box_mask = stack.pop()
+        if not box_mask & ~goals:
+            return False
+        if len(visited) > limit:
+            return False
+        blocked = walls | box_mask
+        mask = box_mask
+        while mask:
+            low = mask & -mask
+            b = low.bit_length() - 1
+            mask ^= low
+            for d in OFFSETS:
+                dest = b + d
+                if not region >> (b - d) & 1 or blocked >> dest & 1:
+                    continue
+                new_boxes = box_mask ^ low
+                if not RING_MASK >> dest & 1:
+                    new_boxes |= 1 << dest
+                new_region = _region(b, walls | new_boxes)
+                key = ((new_region & -new_region).bit_length(), new_boxes)
+                if key not in visited:
+                    visited.add(key)
+                    stack.append((new_region, new_boxes))
+    return True
+
+
+class PatternDatabase:
+    """Kho mẫu deadlock nhỏ, học trong lúc tìm kiếm và lưu xuống đĩa.
+
+    Mỗi mẫu là một cửa sổ SIZE x SIZE đã được chứng minh deadlock; khi thêm
+    vào, cả 8 phép quay/lật đều được đưa vào bảng băm để tra O(1). Mặc định
+    chỉ nằm trong bộ nhớ; path (tùy chọn) là file để nạp lúc tạo và để save()
+    ghi các mẫu mới (pending) khi nơi gọi muốn lưu.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.index = set()  # Mọi biến thể của các mẫu đã biết
+        self.pending = []  # Mẫu mới học, chưa ghi xuống đĩa
+        self._checked = WeakKeyDictionary()  # Màn -> cửa sổ đã thử chứng minh nhưng không được
+        self._windows = WeakKeyDictionary()
+        if path and os.path.exists(path):
+            self.load()
+
+    def load(self, path=None):
+        """Nạp mẫu từ file (mặc định self.path), các lần save() sau ghi vào file này"""
+        self.path = path or self.path
+        with open(self.path) as f:
+            for line in f:
+                pattern = line.strip().replace("|", "")
+                if len(pattern) == SIZE * SIZE:
+                    self.index.update(_transforms(pattern))
+
+    def save(self, path=None):
+        """Ghi nối các mẫu mới học vào file (mặc định self.path).
+
+        Nhiều tiến trình có thể ghi cùng một file nên việc ghi đi qua file khóa;
+        không lấy được khóa thì giữ mẫu lại cho lần sau. Trả về True nếu đã ghi.
+        """
+        self.path = path or self.path
+        if not self.path:
+            raise ValueError("PatternDatabase chưa có path để lưu")
+        if not self.pending:
+            return True
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        lock = self.path + ".lock"
+        deadline = time.monotonic() + LOCK_WAIT
+        while True:
+            try:
+                fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    # Tiến trình giữ khóa bị kết thúc giữa chừng
+                    if time.time() - os.path.getmtime(lock) > LOCK_STALE:
+                        os.remove(lock)
+                        continue
+                except OSError:
+                    continue
+                if time.monotonic() > deadline:
+                    return False
+                time.sleep(0.01)
+        try:
+            with open(self.path, "a") as f:
+                for pattern in self.pending:
+                    rows = [pattern[i * SIZE:(i + 1) * SIZE] for i in range(SIZE)]
+                    f.write("|".join(rows) + "\n")
+            self.pending.clear()
+        finally:
+            os.close(fd)
+            os.remove(lock)
+        return True
+
+    def _window(self, level, cell):
+        """Các id ô trong cửa sổ quanh cell (-1 là tường), dựng một lần mỗi màn"""
+        windows = self._windows.get(level)
+        if windows is None:
+            windows = []
+            for i, j in level.cells:
+                windows.append([
+                    level.index.get((i + di, j + dj), -1)
+                    for di in range(-RADIUS, RADIUS + 1)
+                    for dj in range(-RADIUS, RADIUS + 1)
+                ])
+            self._windows[level] = windows
+        return windows[cell]
+
+    def _window_mask(self, level, cell):
+        mask = 0
+        for c in self._window(level, cell):
+            if c >= 0:
+                mask |= 1 << c
+        return mask
+
+    def encode(self, level, boxes, cell, region):
+        """Mã hóa cửa sổ quanh cell; None nếu cửa sổ chỉ có một hộp"""
+        goal_mask = level.goal_mask
+        chars = []
+        count = 0
+        for c in self._window(level, cell):
+            if c < 0:
+                chars.append(WALL)
+            elif boxes >> c & 1:
+                count += 1
+                chars.append(BOX_GOAL if goal_mask >> c & 1 else BOX)
+            elif region >> c & 1:
+                chars.append(GOAL if goal_mask >> c & 1 else FLOOR)
+            else:
+                chars.append(CLOSED_GOAL if goal_mask >> c & 1 else CLOSED_FLOOR)
+        # Deadlock một hộp đã có bảng ô chết lo
+        if count < 2:
+            return None
+        return "".join(chars)
+
+    def is_deadlock(self, level, boxes, cell, region):
+        """Tra mẫu deadlock quanh hộp vừa đẩy (region là vùng người chơi)"""
+        pattern = self.encode(level, boxes, cell, region)
+        return pattern is not None and pattern in self.index
+
+    def learn(self, level, boxes, cell, region, cells=0):
+        """Chứng minh cửa sổ quanh cell là deadlock và lưu lại nếu được.
+
+        cells: các ô (ví dụ một corral) phải nằm trọn trong cửa sổ mới thử.
+        """
+        if cells & ~self._window_mask(level, cell):
+            return False
+        pattern = self.encode(level, boxes, cell, region)
+        checked = self._checked.get(level)
+        if checked is None:
+            checked = self._checked[level] = set()
+        if pattern is None or pattern in self.index or pattern in checked:
+            return False
+        if prove_deadlock(pattern):
+            self.index.update(_transforms(pattern))
+            self.pending.append(pattern)
+            return True
+        if len(checked) >= CHECKED_LIMIT:
+            checked.clear()
+        checked.add(pattern)
+        return False
+
+
+_database = None
+
+
+def get_database():
+    """Kho mẫu dùng chung của tiến trình (chỉ trong bộ nhớ; gọi load()/save() để dùng file)"""
+    global _database
+    if _database is None:
+        _database = PatternDatabase()
+    return _database
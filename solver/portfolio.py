@@ -0,0 +1,153 @@
+import io
+import os
+import time
+import queue
+import threading
+import multiprocessing
+from types import SimpleNamespace
+from contextlib import redirect_stdout
+from State import State
+from solver.bfs import bfs
+from solver.dfs import dfs
+from solver.a_star import a_star, box_toNearest
+from solver.budget import Budget, CancelToken
+from solver.stats import SolverStats
+
+# Danh sách chiến lược mặc định: (tên, hàm giải, tham số)
+PORTFOLIO = [
+    ("BFS", bfs, {}),
+    ("DFS", dfs, {}),
+    ("A*", a_star, {"buckets": True}),
+    ("Weighted A*", a_star, {"weight": 2, "buckets": True}),
+    ("Push A*", a_star, {"push": True, "buckets": True}),
+    ("Push A* (nearest)", a_star, {"push": True, "h": box_toNearest, "buckets": True}),
+    ("Push WA*", a_star, {"push": True, "weight": 3, "buckets": True}),
+]
+
+# Chu kỳ kiểm tra tiến trình con bị chết bất thường (giây)
+POLL_INTERVAL = 0.1
+# Thời gian chờ (giây) các chiến lược bị hủy gửi thống kê về trước khi bị kết thúc
+CANCEL_GRACE = 1.0
+
+
+def _watch(cancel, token):
+    # Chuyển cờ hủy giữa tiến trình sang CancelToken, solver kiểm tra mỗi nút nên cần rẻ
+    cancel.wait()
+    token.cancel()
+
+
+def _worker(name, solver, kwargs, matrix, results, cancel):
+    """Chạy một chiến lược trong tiến trình riêng và gửi (tên, lời giải, SolverStats) về.
+
+    cancel: multiprocessing.Event, được đặt thì solver dừng và gửi thống kê tới lúc dừng.
+    """
+    state = State.from_game(SimpleNamespace(matrix=matrix))
+    token = CancelToken()
+    threading.Thread(target=_watch, args=(cancel, token), daemon=True).start()
+    budget = Budget(token=token)
+    try:
+        # Bỏ phần in của solver, thống kê lấy từ budget
+        with redirect_stdout(io.StringIO()):
+            result = solver(state, budget=budget, **kwargs)
+    except Exception as e:
+        print(f"Error in {name}: {e!r}")
+        result = budget.finish(None, budget.nodes, budget.states, "error")
+    directions = list(result[1]) if result else None
+    results.put((name, directions, budget.stats))
+
+
+def run_portfolio(game, portfolio=PORTFOLIO, first_wins=True, max_workers=None, timeout=None, token=None):
+    """Chạy song song nhiều chiến lược giải trên các tiến trình riêng.
+
+    game: đối tượng có matrix (như Game). first_wins=True: lời giải đầu tiên
+    thắng, các tiến trình còn lại bị hủy; False: chờ mọi chiến lược xong để so
+    sánh. max_workers: số tiến trình chạy cùng lúc (mặc định số lõi CPU).
+    timeout: giới hạn thời gian (giây) cho cả lần chạy. token: CancelToken tùy
+    chọn, bị hủy thì dừng mọi tiến trình còn chạy.
+    Trả về (tên chiến lược thắng, directions, {tên: SolverStats}); không có
+    lời giải thì tên và directions là None.
+    """
+    matrix = [list(row) for row in game.matrix]
+    max_workers = max_workers or os.cpu_count() or 1
+    deadline = time.perf_counter() + timeout if timeout is not None else None
+    results = multiprocessing.Queue()
+    waiting = list(portfolio)
+    running = {}  # tên -> (tiến trình, thời điểm bắt đầu, cờ hủy)
+    stats = {}
+    winner = None
+    directions = None
+    status = "cancelled"  # Trạng thái của các chiến lược chưa xong khi dừng
+
+    def launch():
+        while waiting and len(running) < max_workers:
+            name, solver, kwargs = waiting.pop(0)
+            cancel = multiprocessing.Event()
+            process = multiprocessing.Process(target=_worker, args=(name, solver, kwargs, matrix, results, cancel), daemon=True)
+            process.start()
+            running[name] = (process, time.perf_counter(), cancel)
+
+    def reap():
+        # Tiến trình chết mà không gửi kết quả (thoát bình thường thì mã 0)
+        for name, (process, started, _) in list(running.items()):
+            if not process.is_alive() and process.exitcode != 0:
+                del running[name]
+                stats[name] = SolverStats("error", wall_time=time.perf_counter() - started)
+
+    launch()
+    while running:
+        if token is not None and token.cancelled:
+            break
+        wait = POLL_INTERVAL
+        if deadline is not None:
+            wait = min(wait, deadline - time.perf_counter())
+            if wait <= 0:
+                status = "timeout"
+                break
+        try:
+            name, solution, worker_stats = results.get(timeout=wait)
+        except queue.Empty:
+            reap()
+            launch()
+            continue
+        process = running.pop(name)[0]
+        process.join()
+        stats[name] = worker_stats
+        if solution is not None and winner is None:
+            winner, directions = name, solution
+            if first_wins:
+                break
+        launch()
+
+    # Hủy các chiến lược còn chạy, chờ chúng gửi thống kê tới lúc dừng
+    for _, _, cancel in running.values():
+        cancel.set()
+    grace = time.perf_counter() + CANCEL_GRACE
+    while running and time.perf_counter() < grace:
+        try:
+            name, _, worker_stats = results.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            reap()
+            continue
+        process = running.pop(name)[0]
+        process.join()
+        if worker_stats.status == "cancelled":
+            worker_stats.status = status
+        stats[name] = worker_stats
+    # Không kịp trả lời: chỉ còn trạng thái và thời gian
+    for name, (process, started, _) in running.items():
+        process.terminate()
+        process.join()
+        stats[name] = SolverStats(status, wall_time=time.perf_counter() - started)
+    for name, _, _ in waiting:
+        stats[name] = SolverStats(status)
+    results.close()
+
+    print("\n=== Portfolio ===")
+    print(f"{'Strategy':<20} {'Status':<10} {'Time (s)':<10} {'CPU (s)':<10} {'Nodes':<10} {'Nodes/s':<10} {'Length':<8}")
+    print("-" * 80)
+    for name, _, _ in portfolio:
+        s = stats[name]
+        print(f"{name:<20} {s.status:<10} {s.wall_time:<10.4f} {s.cpu_time:<10.4f} {s.expanded:<10} "
+              f"{s.nodes_per_sec:<10.0f} {s.path_length:<8}")
+    print("Winner:", winner)
+    return winner, directions, stats
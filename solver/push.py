@@ -0,0 +1,108 @@
+from collections import deque
+from State import State
+from LevelContext import DIRECTION_CHARS, OPPOSITE
+from solver.deadlock import freeze_deadlock
+from solver.corral import pi_corral_pushes
+from solver.patterns import get_database
+
+
+def normalize(state):
+    """Đưa người chơi về ô đại diện của vùng (id nhỏ nhất)"""
+    _, canonical = state.level.reachable(state.player, state.boxes)
+    return State(canonical, state.boxes, state.level)
+
+
+def push_successors(state, counters=None):
+    """Sinh các trạng thái sau một lần đẩy hộp.
+
+    Trả về list (push, State) với push = (ô hộp, hướng đẩy) và State đã chuẩn hóa.
+    Nếu có PI-corral chưa giải thì chỉ xét các lần đẩy vào corral đó.
+    counters: Counters tùy chọn, ghi lại con bị cắt theo lý do ("dead_square",
+    "freeze", "pattern"; "corral" khi corral được chứng minh deadlock).
+    """
+    level = state.level
+    neighbors = level.neighbors
+    boxes = state.boxes
+    dead_mask = level.dead_mask
+    region, _ = level.reachable(state.player, boxes)
+
+    candidates = pi_corral_pushes(level, state.player, region, boxes)
+    if candidates == [] and counters is not None:
+        counters.prune("corral")
+    if candidates is None:
+        candidates = []
+        for box in level.iter_cells(boxes):
+            box_neighbors = neighbors[box]
+            for k in range(4):
+                behind = box_neighbors[OPPOSITE[k]]
+                if behind < 0 or not region >> behind & 1:
+                    continue
+                dest = box_neighbors[k]
+                if dest < 0 or boxes >> dest & 1:
+                    continue
+                if dead_mask >> dest & 1:
+                    if counters is not None:
+                        counters.prune("dead_square")
+                    continue
+                candidates.append((box, k))
+
+    patterns = get_database()
+    successors = []
+    for box, k in candidates:
+        dest = neighbors[box][k]
+        new_boxes = boxes ^ (1 << box) ^ (1 << dest)
+        if freeze_deadlock(level, new_boxes, dest):
+            if counters is not None:
+                counters.prune("freeze")
+            continue
+        new_region, canonical = level.reachable(box, new_boxes)
+        if patterns.is_deadlock(level, new_boxes, dest, new_region):
+            if counters is not None:
+                counters.prune("pattern")
+            continue
+        successors.append(((box, k), State(canonical, new_boxes, level)))
+    return successors
+
+
+def walk(level, start, goal, boxes):
+    """Đường đi ngắn nhất của người chơi giữa hai ô, tránh hộp"""
+    if start == goal:
+        return []
+    neighbors = level.neighbors
+    came_from = {start: None}
+    queue = deque([start])
+    while queue:
+        c = queue.popleft()
+        for k, n in enumerate(neighbors[c]):
+            if n < 0 or n in came_from or boxes >> n & 1:
+                continue
+            came_from[n] = (c, k)
+            if n == goal:
+                moves = []
+                while came_from[n] is not None:
+                    n, k = came_from[n]
+                    moves.append(DIRECTION_CHARS[k])
+                moves.reverse()
+                return moves
+            queue.append(n)
+    return None
+
+
+def expand_pushes(start_state, pushes):
+    """Dựng lại lời giải mức bước đi (LURD) từ dãy lần đẩy hộp"""
+    level = start_state.level
+    player, boxes = start_state.player, start_state.boxes
+    path = [State(player, boxes, level)]
+    directions = []
+    for box, k in pushes:
+        behind = level.neighbors[box][OPPOSITE[k]]
+        for move in walk(level, player, behind, boxes):
+            player = level.neighbors[player][DIRECTION_CHARS.index(move)]
+            path.append(State(player, boxes, level))
+            directions.append(move)
+        dest = level.neighbors[box][k]
+        boxes = boxes ^ (1 << box) ^ (1 << dest)
+        player = box
+        path.append(State(player, boxes, level))
+        directions.append(DIRECTION_CHARS[k])
+    return path, directions
@@ -0,0 +1,67 @@
+class SolverStats:
+    """Thống kê một lần giải (Budget.finish tạo ra, kèm theo lời giải).
+
+    status: "solved", "failed", "error" hoặc lý do dừng sớm của Budget
+    ("cancelled", "time", "nodes", "states"); portfolio dùng thêm "timeout".
+    expanded/generated: số nút mở rộng/sinh ra; duplicates: số con đã gặp;
+    pruned: số con bị cắt theo lý do; peak_open/peak_closed: kích thước lớn
+    nhất của biên và của bảng trạng thái đã lưu; wall_time (perf_counter) và
+    cpu_time (process_time) theo giây; memory_peak theo byte (xem
+    solver.instrument); path_length: số bước của lời giải, 0 nếu không có.
+    """
+    __slots__ = ('status', 'expanded', 'generated', 'duplicates', 'pruned', 'peak_open', 'peak_closed',
+                 'wall_time', 'cpu_time', 'memory_peak', 'path_length')
+
+    def __init__(self, status, expanded=0, generated=0, duplicates=0, pruned=None, peak_open=0,
+                 peak_closed=0, wall_time=0.0, cpu_time=0.0, memory_peak=0, path_length=0):
+        self.status = status
+        self.expanded = expanded
+        self.generated = generated
+        self.duplicates = duplicates
+        self.pruned = pruned if pruned is not None else {}
+        self.peak_open = peak_open
+        self.peak_closed = peak_closed
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
+        self.memory_peak = memory_peak
+        self.path_length = path_length
+
+    @property
+    def solved(self):
+        return self.status == "solved"
+
+    @property
+    def nodes_per_sec(self):
+        return self.expanded / self.wall_time if self.wall_time > 0 else 0.0
+
+    def as_dict(self):
+        """dict các trường (kèm nodes_per_sec) để ghi CSV/JSON"""
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["nodes_per_sec"] = self.nodes_per_sec
+        return data
+
+    def __repr__(self):
+        return (f"SolverStats({self.status!r}, expanded={self.expanded}, generated={self.generated}, "
+                f"duplicates={self.duplicates}, pruned={self.pruned}, peak_open={self.peak_open}, "
+                f"peak_closed={self.peak_closed}, wall_time={self.wall_time:.4f}, "
+                f"cpu_time={self.cpu_time:.4f}, nodes_per_sec={self.nodes_per_sec:.0f})")
+
+
+class Solution(tuple):
+    """Lời giải (path, directions) kèm stats: vẫn tách được như tuple hai phần tử"""
+
+    def __new__(cls, path, directions, stats=None):
+        solution = super().__new__(cls, (path, directions))
+        solution.stats = stats
+        return solution
+
+    def __getnewargs__(self):
+        return self[0], self[1]
+
+    @property
+    def path(self):
+        return self[0]
+
+    @property
+    def directions(self):
+        return self[1]
@@ -0,0 +1,55 @@
+import queue
+import threading
+from solver.budget import Budget, CancelToken
+from solver.events import SolutionEvent
+
+
+def run_with_events(solver, start_state, listener, budget=None, **kwargs):
+    """Chạy solver(start_state, budget=..., **kwargs) và gửi sự kiện qua listener.
+
+    listener nhận ProgressEvent định kỳ (mỗi budget.progress_interval giây) rồi
+    một SolutionEvent cuối. Solver không cần sửa: tiến độ đi qua Budget mà mọi
+    solver đã kiểm tra trong vòng lặp. Trả về kết quả của solver.
+    """
+    budget = budget or Budget()
+    budget.listener = listener
+    result = solver(start_state, budget=budget, **kwargs)
+    listener(SolutionEvent(solver.__name__, result, budget.stats))
+    return result
+
+
+def stream(solver, start_state, budget=None, **kwargs):
+    """Generator sự kiện của một lần giải: ProgressEvent..., rồi SolutionEvent.
+
+    Solver chạy trong một luồng nền; dừng đọc giữa chừng (break hoặc close())
+    sẽ hủy lần giải qua CancelToken của budget.
+
+        for event in stream(a_star, state, push=True):
+            if event.kind == "progress":
+                print(event.expanded, event.rate)
+    """
+    budget = budget or Budget()
+    if budget.token is None:
+        budget.token = CancelToken()
+    events = queue.Queue()
+
+    def run():
+        try:
+            run_with_events(solver, start_state, events.put, budget, **kwargs)
+        except BaseException as error:
+            events.put(error)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        while True:
+            event = events.get()
+            if isinstance(event, BaseException):
+                raise event
+            yield event
+            if event.kind == "solution":
+                break
+    finally:
+        if thread.is_alive():
+            budget.token.cancel()
+            thread.join()
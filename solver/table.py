@@ -0,0 +1,130 @@
+from array import array
+from State import State
+
+# g rỗng đánh dấu ô trống của bảng
+EMPTY = 0xFFFFFFFF
+# Mã nước đi rỗng (trạng thái đầu hoặc chưa ghi)
+NO_MOVE = 0xFFFF
+# Tỷ lệ lấp đầy tối đa trước khi nhân đôi bảng
+MAX_LOAD = 0.7
+
+
+class StateTable:
+    """Bảng băm địa chỉ mở (dò tuyến tính) cho trạng thái, lưu trên mảng kiểu cố định.
+
+    Khóa là State.pack() (level.state_bytes byte) đặt liền nhau trong một
+    bytearray; mỗi mục kèm g (array 'I') và mã nước đi tới nó (array 'H', đủ
+    cho cả mã đẩy ô hộp * 4 + hướng). Dùng thay set/dict của State: add, in,
+    get, [] đọc/ghi g. Đầy quá max_load thì nhân đôi sức chứa.
+    """
+
+    def __init__(self, level, capacity=1024, max_load=MAX_LOAD):
+        self.level = level
+        self.width = level.state_bytes
+        self.max_load = max_load
+        self.count = 0
+        self._allocate(max(8, 1 << (capacity - 1).bit_length()))
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self.mask = capacity - 1
+        self.keys = bytearray(capacity * self.width)
+        self.g = array('I', [EMPTY]) * capacity
+        self.moves = array('H', [NO_MOVE]) * capacity
+
+    def _slot(self, key):
+        """Vị trí của key, hoặc ô trống đầu tiên trên dãy dò"""
+        width = self.width
+        keys = self.keys
+        g = self.g
+        mask = self.mask
+        slot = hash(key) & mask
+        while g[slot] != EMPTY:
+            offset = slot * width
+            if keys[offset:offset + width] == key:
+                return slot
+            slot = (slot + 1) & mask
+        return slot
+
+    def _grow(self):
+        keys, g, moves, width = self.keys, self.g, self.moves, self.width
+        self._allocate(self.capacity * 2)
+        for old in range(len(g)):
+            if g[old] != EMPTY:
+                key = bytes(keys[old * width:(old + 1) * width])
+                slot = self._slot(key)
+                self.keys[slot * width:(slot + 1) * width] = key
+                self.g[slot] = g[old]
+                self.moves[slot] = moves[old]
+
+    def put(self, state, g=0, move=NO_MOVE):
+        """Thêm hoặc ghi đè g và mã nước đi của state"""
+        key = state.pack()
+        slot = self._slot(key)
+        if self.g[slot] == EMPTY:
+            if (self.count + 1) > self.capacity * self.max_load:
+                self._grow()
+                slot = self._slot(key)
+            self.keys[slot * self.width:(slot + 1) * self.width] = key
+            self.count += 1
+        self.g[slot] = g
+        self.moves[slot] = move
+
+    def add(self, state):
+        """Dùng như set.add (g = 0, không có nước đi)"""
+        if state not in self:
+            self.put(state)
+
+    def record(self, state, move):
+        """Ghi mã nước đi của state (None: trạng thái đầu), giữ g nếu đã có"""
+        key = state.pack()
+        slot = self._slot(key)
+        if self.g[slot] == EMPTY:
+            self.put(state, 0, NO_MOVE if move is None else move)
+        else:
+            self.moves[slot] = NO_MOVE if move is None else move
+
+    def get(self, state, default=None):
+        """g của state, hoặc default nếu chưa có"""
+        g = self.g[self._slot(state.pack())]
+        return default if g == EMPTY else g
+
+    def move(self, state):
+        """Mã nước đi đã ghi cho state, hoặc None"""
+        slot = self._slot(state.pack())
+        if self.g[slot] == EMPTY or self.moves[slot] == NO_MOVE:
+            return None
+        return self.moves[slot]
+
+    def __contains__(self, state):
+        return self.g[self._slot(state.pack())] != EMPTY
+
+    def __getitem__(self, state):
+        g = self.get(state)
+        if g is None:
+            raise KeyError(state)
+        return g
+
+    def __setitem__(self, state, g):
+        slot = self._slot(state.pack())
+        if self.g[slot] == EMPTY:
+            self.put(state, g)
+        else:
+            self.g[slot] = g
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        width = self.width
+        for slot in range(self.capacity):
+            if self.g[slot] != EMPTY:
+                yield State.unpack(bytes(self.keys[slot * width:(slot + 1) * width]), self.level)
+
+    @property
+    def load_factor(self):
+        return self.count / self.capacity
+
+    def memory(self):
+        """Số byte của các mảng lưu trữ"""
+        return len(self.keys) + self.g.itemsize * len(self.g) + self.moves.itemsize * len(self.moves)
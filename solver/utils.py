@@ -1,71 +1,91 @@
-def reconstruct_path(state, parent):
-    """Hàm truy vết đường đi và in ra hướng di chuyển"""
-    path = []
-    directions = []
-    
-    # Truy vết đường đi từ goal về start
-    while state is not None:
+from State import State
+from LevelContext import DIRECTION_CHARS, OPPOSITE
+from solver.push import expand_pushes
+
+# Bit đánh dấu bước đi có đẩy hộp: mã bước = hướng (0-3) | MOVE_PUSH
+MOVE_PUSH = 4
+
+
+def move_code(state, next_state):
+    """Mã một byte của bước đi từ state sang next_state"""
+    k = state.level.neighbors[state.player].index(next_state.player)
+    return k | MOVE_PUSH if next_state.boxes != state.boxes else k
+
+
+def push_code(push):
+    """Mã của lần đẩy (ô hộp, hướng): ô hộp * 4 + hướng"""
+    box, k = push
+    return box * 4 + k
+
+
+def undo_move(state, code):
+    """Trạng thái trước bước đi có mã code"""
+    level = state.level
+    k = code & 3
+    boxes = state.boxes
+    if code & MOVE_PUSH:
+        # Hộp vừa bị đẩy từ ô người chơi đang đứng sang ô phía trước
+        boxes ^= (1 << state.player) | (1 << level.neighbors[state.player][k])
+    return State(level.neighbors[state.player][OPPOSITE[k]], boxes, level)
+
+
+def undo_push(state, code):
+    """Trạng thái (đã chuẩn hóa) trước lần đẩy có mã code"""
+    level = state.level
+    box, k = divmod(code, 4)
+    boxes = state.boxes ^ (1 << box) ^ (1 << level.neighbors[box][k])
+    _, canonical = level.reachable(level.neighbors[box][OPPOSITE[k]], boxes)
+    return State(canonical, boxes, level)
+
+
+def apply_push(state, code):
+    """Trạng thái (đã chuẩn hóa) sau lần đẩy có mã code"""
+    level = state.level
+    box, k = divmod(code, 4)
+    boxes = state.boxes ^ (1 << box) ^ (1 << level.neighbors[box][k])
+    _, canonical = level.reachable(box, boxes)
+    return State(canonical, boxes, level)
+
+
+def path_codes(path, pushes=None):
+    """Mã bước (hoặc mã đẩy nếu có pushes) của từng trạng thái trên một đường đi đã biết"""
+    if pushes is not None:
+        return {state: push_code(push) for state, push in zip(path[1:], pushes)}
+    return {state: move_code(prev, state) for prev, state in zip(path, path[1:])}
+
+
+def unwind_moves(state, move_of):
+    """Lùi từ state theo mã bước tới trạng thái đầu (move_of trả về None).
+
+    move_of(state): mã bước dẫn tới state. Trả về (path, directions), không in.
+    """
+    path = [state]
+    codes = []
+    code = move_of(state)
+    while code is not None:
+        codes.append(code)
+        state = undo_move(state, code)
         path.append(state)
-        state = parent[state]
-    
-    # Đảo ngược để có thứ tự từ start đến goal
+        code = move_of(state)
     path.reverse()
-    
-    # Tính toán các hướng di chuyển
-    for i in range(1, len(path)):
-        prev_pos = path[i-1].player
-        current_pos = path[i].player
-        
-        # Tính toán hướng di chuyển
-        dx = current_pos[0] - prev_pos[0]
-        dy = current_pos[1] - prev_pos[1]
-        
-        if dx == -1:
-            directions.append("U")
-        elif dx == 1:
-            directions.append("D")
-        elif dy == -1:
-            directions.append("L")
-        elif dy == 1:
-            directions.append("R")
-        else:
-            directions.append("?")  
-    
+    codes.reverse()
+    return path, [DIRECTION_CHARS[code & 3] for code in codes]
+
+
+def reconstruct_path(state, move_of):
+    """Hàm truy vết đường đi từ mã bước và in ra hướng di chuyển"""
+    path, directions = unwind_moves(state, move_of)
+
     # In ra kết quả
     print("Solution path:")
-    print("".join(directions)) 
+    print("".join(directions))
     print(f"Total steps: {len(directions)}")
-    
-    return path, directions
-
 
-def reconstruct_a_star_path(goal_state, came_from, g_score):
-    path = []
-    directions = []
-
-    current = goal_state
-    while current is not None:
-        path.append(current)
-        current = came_from.get(current, None)
+    return path, directions
 
-    path.reverse()
 
-    for i in range(1, len(path)):
-        prev_pos = path[i-1].player
-        curr_pos = path[i].player
-        dx = curr_pos[0] - prev_pos[0]
-        dy = curr_pos[1] - prev_pos[1]
-
-        if dx == -1:
-            directions.append('U')
-        elif dx == 1:
-            directions.append('D')
-        elif dy == -1:
-            directions.append('L')
-        elif dy == 1:
-            directions.append('R')
-        else:
-            directions.append('?')
+def reconstruct_a_star_path(goal_state, move_of, g_score):
+    path, directions = unwind_moves(goal_state, move_of)
 
     # In kết quả
     print("Solution path:")
@@ -76,4 +96,23 @@ def reconstruct_a_star_path(goal_state, came_from, g_score):
     cost = g_score.get(goal_state, float('inf'))
     print("Total cost (g_score):", cost)
 
-    return path, directions
\ No newline at end of file
+    return path, directions
+
+def reconstruct_push_path(state, push_of, start_state):
+    """Truy vết dãy lần đẩy hộp từ mã đẩy rồi dựng lại đường đi mức bước đi"""
+    push_list = []
+    code = push_of(state)
+    while code is not None:
+        push_list.append(divmod(code, 4))
+        state = undo_push(state, code)
+        code = push_of(state)
+    push_list.reverse()
+
+    path, directions = expand_pushes(start_state, push_list)
+
+    print("Solution path:")
+    print("".join(directions))
+    print(f"Total pushes: {len(push_list)}")
+    print(f"Total steps: {len(directions)}")
+
+    return path, directions